@@ -88,11 +88,18 @@ class Action:  # Lawsuit
 				entity.trigger_event(source, event, args)
 
 	def broadcast(self, source, at, *args):
+		listeners = source.game.listeners
+		cls = self.__class__
+		if not listeners.has_listeners(cls, at):
+			return
+
 		for entity in source.game.entities:
-			self._broadcast(entity, source, at, *args)
+			if listeners.may_listen(entity, cls, at):
+				self._broadcast(entity, source, at, *args)
 
 		for entity in source.game.hands:
-			self._broadcast(entity, source, at, *args)
+			if listeners.may_listen(entity, cls, at):
+				self._broadcast(entity, source, at, *args)
 
 	def queue_broadcast(self, obj, args):
 		self.event_queue.append((obj, args))
@@ -1004,6 +1011,7 @@ class Silence(TargetedAction):
 
 		# Wipe the event listeners
 		target._events = []
+		target.game.listeners.register(target)
 		target.silenced = True
 
 
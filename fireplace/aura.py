@@ -3,21 +3,34 @@ from .managers import CardManager
 
 
 class AuraBuff:
+	# __dict__ holds the attributes set from the aura's tags
+	__slots__ = ("__dict__", "source", "entity", "tick", "aura_key", "_last_tags", "_manager")
+
 	def __init__(self, source, entity):
 		self.source = source
 		self.entity = entity
-		self.tags = CardManager(self)
+		self._last_tags = None
 
 	def __repr__(self):
 		return "<AuraBuff %r -> %r>" % (self.source, self.entity)
 
+	@property
+	def tags(self):
+		try:
+			return self._manager
+		except AttributeError:
+			self._manager = CardManager(self)
+			return self._manager
+
 	def update_tags(self, tags):
-		self.tags.update(tags)
-		self.tick = self.source.game.tick
+		if tags != self._last_tags:
+			CardManager.update_object(self, tags)
+			self._last_tags = dict(tags)
+			self.entity._invalidate_derived()
 
 	def remove(self):
 		log.info("Destroying %r", self)
-		self.entity.slots.remove(self)
+		self.entity.remove_slot(self)
 		self.source.game.active_aura_buffs.remove(self)
 
 	def _getattr(self, attr, i):
@@ -26,19 +39,126 @@ class AuraBuff:
 			return value(self.entity, i)
 		return i + value
 
+	def _static_delta(self, attr):
+		value = getattr(self, attr, 0)
+		if callable(value):
+			return None
+		return value
+
+
+class ActiveAuraBuffs:
+	"""
+	The buffs (enchantments and AuraBuffs) auras currently apply, keyed by
+	(source, target, buff ID), the ID being None for AuraBuffs, and
+	bucketed by the tick they were last refreshed on, so that finding,
+	refreshing and expiring buffs doesn't scan the ones left unchanged.
+	Buffs are numbered by add() (aura_key), in creation order.
+	"""
+	def __init__(self):
+		# (source entity_id, target entity_id, buff ID) -> buff
+		self.buffs = {}
+		# tick -> {aura_key: buff}
+		self.ticks = {}
+		# aura_key -> key in self.buffs
+		self._entries = {}
+		# aura_keys are given in creation order
+		self._counter = 0
+
+	def __repr__(self):
+		return "<%s (%i buffs)>" % (self.__class__.__name__, len(self))
+
+	def __len__(self):
+		return len(self.buffs)
+
+	def __iter__(self):
+		return iter(list(self.buffs.values()))
+
+	def __contains__(self, buff):
+		key = getattr(buff, "aura_key", None)
+		return key in self._entries and self.buffs[self._entries[key]] is buff
+
+	def get(self, source, target, buff_id=None):
+		"""
+		Returns the buff the aura of \a source applies to \a target, if any
+		"""
+		return self.buffs.get((source.entity_id, target.entity_id, buff_id))
+
+	def add(self, buff, source, target, buff_id=None):
+		key = (source.entity_id, target.entity_id, buff_id)
+		self.buffs[key] = buff
+		buff.aura_key = self._counter
+		self._counter += 1
+		self._entries[buff.aura_key] = key
+		buff.tick = None
+
+	def touch(self, buff, tick):
+		"""
+		Mark \a buff as refreshed on \a tick
+		"""
+		if buff.tick != tick:
+			self._unbucket(buff)
+			self.ticks.setdefault(tick, {})[buff.aura_key] = buff
+			buff.tick = tick
+
+	def remove(self, buff):
+		del self.buffs[self._entries.pop(buff.aura_key)]
+		self._unbucket(buff)
+
+	def _unbucket(self, buff):
+		if buff.tick is not None:
+			bucket = self.ticks[buff.tick]
+			del bucket[buff.aura_key]
+			if not bucket:
+				del self.ticks[buff.tick]
+
+	def expired(self, tick):
+		"""
+		Returns the buffs last refreshed before \a tick, in creation order
+		"""
+		ret = []
+		for t in [t for t in self.ticks if t < tick]:
+			ret += self.ticks[t].items()
+		return [buff for key, buff in sorted(ret)]
+
 
 class Refresh:
 	"""
 	Refresh a buff or a set of tags on an entity
 	"""
+	# Check cached targets against a fresh evaluation of the selector
+	verify_targets = False
+
 	def __init__(self, selector, tags=None, buff=None, priority=50):
 		self.selector = selector
 		self.tags = tags
 		self.buff = buff
 		self.priority = priority
 
+	def targets(self, source):
+		"""
+		Returns the entities the aura of \a source applies to.
+		Structural selectors are only evaluated again once an entity
+		changed zone; the others are evaluated on every refresh.
+		"""
+		game = source.game
+		if not self.selector.structural:
+			return self.selector.eval(game, source)
+
+		key = (id(self), source.entity_id)
+		cached = game.aura_targets.get(key)
+		if cached is not None and cached[0] == game.zone_version:
+			if self.verify_targets:
+				expected = self.selector.eval(game, source)
+				assert [e.entity_id for e in cached[1]] == [e.entity_id for e in expected], (
+					"Stale targets of %r from %r: %r != %r" % (self, source, cached[1], expected)
+				)
+			return cached[1]
+		entities = self.selector.eval(game, source)
+		game.aura_targets[key] = (game.zone_version, entities)
+		return entities
+
 	def trigger(self, source):
-		entities = self.selector.eval(source.game, source)
+		entities = self.targets(source)
 		for entity in entities:
 			if self.buff:
 				entity.refresh_buff(source, self.buff)
@@ -56,25 +176,26 @@ class Refresh:
 
 
 class TargetableByAuras:
+	__slots__ = ()
+
 	def refresh_buff(self, source, id):
-		for buff in self.buffs:
-			if buff.source is source and buff.id == id:
-				buff.tick = source.game.tick
-				break
-		else:
+		auras = source.game.active_aura_buffs
+		buff = auras.get(source, self, id)
+		if buff is None:
 			log.info("Aura from %r buffs %r with %r", source, self, id)
 			buff = source.buff(self, id)
-			buff.tick = source.game.tick
-			source.game.active_aura_buffs.append(buff)
+			auras.add(buff, source, self, id)
+		auras.touch(buff, source.game.tick)
 
 	def refresh_tags(self, source, tags):
-		for slot in self.slots:
-			if slot.source is source:
-				slot.update_tags(tags)
-				break
+		auras = source.game.active_aura_buffs
+		buff = auras.get(source, self)
+		if buff is not None:
+			buff.update_tags(tags)
 		else:
 			buff = AuraBuff(source, self)
 			log.info("Creating %r", buff)
 			buff.update_tags(tags)
-			self.slots.append(buff)
-			source.game.active_aura_buffs.append(buff)
+			self.add_slot(buff)
+			auras.add(buff, source, self)
+		auras.touch(buff, source.game.tick)
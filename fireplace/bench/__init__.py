@@ -0,0 +1,41 @@
+"""
+Benchmarks, each runnable as python -m fireplace.bench.<name>.
+This package must stay cheap to import: it is imported before anything
+it measures.
+"""
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+	"""
+	Records the wall clock duration of named phases, in order.
+	"""
+	def __init__(self):
+		self.phases = []
+
+	@contextmanager
+	def phase(self, name, **info):
+		start = time.perf_counter()
+		yield
+		info["name"] = name
+		info["seconds"] = time.perf_counter() - start
+		self.phases.append(info)
+
+	@property
+	def total(self):
+		return sum(phase["seconds"] for phase in self.phases)
+
+
+def dump(results, path=None):
+	"""
+	Write \a results as JSON to \a path, or to stdout.
+	"""
+	if path is None:
+		json.dump(results, sys.stdout, indent="\t", sort_keys=True)
+		sys.stdout.write("\n")
+	else:
+		with open(path, "w") as f:
+			json.dump(results, f, indent="\t", sort_keys=True)
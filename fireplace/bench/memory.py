@@ -0,0 +1,149 @@
+"""
+Entity memory benchmark.
+
+Measures the bytes allocated per entity, for each kind of entity, with
+tracemalloc. "slots" is the current layout. "dict_estimate" estimates
+the layout entities had before __slots__ (see DictLayout): it is not a
+measurement of the old code, which has to be run for that.
+
+	python -m fireplace.bench.memory [-n COUNT] [-o FILE]
+"""
+import sys
+import tracemalloc
+import uuid
+from argparse import ArgumentParser
+from . import dump
+
+
+# Kind of entity -> card ID
+CARDS = (
+	("Minion", "CS2_122"),  # Raid Leader
+	("Spell", "CS2_029"),  # Fireball
+	("Secret", "EX1_130"),  # Noble Sacrifice
+	("Weapon", "CS2_106"),  # Fiery War Axe
+	("Enchantment", "CS2_087e"),  # Blessing of Might
+	("HeroPower", "CS2_034"),  # Fireblast
+	("Hero", "HERO_08"),  # Jaina Proudmoore
+)
+
+
+def measure(create, count):
+	"""
+	Return the bytes allocated per object by \a count calls to \a create
+	"""
+	objects = []
+	tracemalloc.start()
+	try:
+		before = tracemalloc.take_snapshot()
+		for i in range(count):
+			objects.append(create())
+		after = tracemalloc.take_snapshot()
+	finally:
+		tracemalloc.stop()
+
+	total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+	# Don't count the list holding the objects
+	total -= sys.getsizeof(objects)
+	return total / count
+
+
+class DictLayout:
+	"""
+	A copy of \a entity with its slots moved to its __dict__, and a Manager
+	and uuid4() created up front, approximating the layout entities had
+	before __slots__. \a manager defaults to entity.Manager.
+	"""
+	def __init__(self, entity, manager=None):
+		for klass in type(entity).__mro__:
+			for name in klass.__dict__.get("__slots__", ()):
+				if name in ("__dict__", "__weakref__"):
+					continue
+				try:
+					value = klass.__dict__[name].__get__(entity, klass)
+				except AttributeError:
+					# Not set
+					continue
+				self.__dict__[name] = value
+		self.__dict__.update(entity.__dict__)
+		self._manager = (manager or entity.Manager)(self)
+		self._uuid = uuid.uuid4()
+
+
+def measure_layouts(create, count, manager=None):
+	"""
+	Return the bytes allocated per object by \a count calls to \a create,
+	in the __slots__ layout and as estimated for the old layout (see
+	DictLayout).
+	"""
+	slots = measure(create, count)
+
+	# The attribute values are the same in both layouts: swap the object
+	# and its __dict__ for a DictLayout.
+	entities = [create() for i in range(count)]
+	layouts = iter(entities)
+	layout = measure(lambda: DictLayout(next(layouts), manager), count)
+	own = sum(sys.getsizeof(entity) + sys.getsizeof(entity.__dict__) for entity in entities)
+
+	return {"slots": slots, "dict_estimate": slots + layout - own / count}
+
+
+def run(count):
+	from fireplace import cards
+	from fireplace.aura import AuraBuff
+	from fireplace.card import Card
+	from fireplace.cards.heroes import MAGE, WARRIOR
+	from fireplace.game import Game
+	from fireplace.managers import CardManager
+	from fireplace.player import Player
+	from fireplace.utils import random_draft
+
+	if not cards.db.initialized:
+		cards.db.initialize()
+
+	ret = {}
+	for kind, id in CARDS:
+		# Warm up, so that lazily merged data isn't counted
+		Card(id)
+		ret[kind] = measure_layouts(lambda: Card(id), count)
+
+	source, entity = Card("CS2_122"), Card("CS2_231")
+	ret["AuraBuff"] = measure_layouts(lambda: AuraBuff(source, entity), count, CardManager)
+
+	def new_player():
+		return Player("Player", [], MAGE)
+	ret["Player"] = measure_layouts(new_player, count)
+
+	deck1, deck2 = random_draft(hero=MAGE), random_draft(hero=WARRIOR)
+
+	def new_game():
+		game = Game(players=(Player("Player1", deck1, MAGE), Player("Player2", deck2, WARRIOR)))
+		game.start()
+		return game
+	games = max(1, count // 100)
+	# Games hold many entities: only measured in the current layout
+	ret["Game (started)"] = {"slots": measure(new_game, games)}
+
+	return ret
+
+
+def main():
+	arguments = ArgumentParser(prog="fireplace.bench.memory")
+	arguments.add_argument(
+		"-n", "--count", type=int, default=1000,
+		help="Number of entities created for each measurement"
+	)
+	arguments.add_argument("-o", "--output", help="Write the results to this file")
+	args = arguments.parse_args(sys.argv[1:])
+
+	results = {
+		"python": sys.version,
+		"count": args.count,
+		"bytes_per_entity": run(args.count),
+	}
+	dump(results, args.output)
+
+	return 0
+
+
+if __name__ == "__main__":
+	exit(main())
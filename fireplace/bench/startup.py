@@ -0,0 +1,123 @@
+"""
+Cold start benchmark.
+
+Measures, in a single process: importing the core fireplace modules,
+then each phase of CardDB.initialize() (importing each card set, loading
+the card data, merging the card database...) and starting the first
+game. Run it in a fresh interpreter:
+
+	python -m fireplace.bench.startup [--cache] [--importtime] [-o FILE]
+"""
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser
+from importlib import import_module
+from . import PhaseTimer, dump
+
+
+CORE_MODULES = ("fireplace.cards", "fireplace.game", "fireplace.player")
+
+
+def run(cache=False):
+	"""
+	Run every startup phase in the current process and return the timer.
+	The card database must not have been initialized yet.
+	"""
+	timer = PhaseTimer()
+
+	with timer.phase("import fireplace", modules=CORE_MODULES):
+		for name in CORE_MODULES:
+			import_module(name)
+
+	from fireplace import cards
+	from fireplace.cards.heroes import MAGE, WARRIOR
+	from fireplace.game import Game
+	from fireplace.player import Player
+	from fireplace.utils import random_draft
+
+	if cards.db.initialized:
+		raise RuntimeError("The card database is already initialized")
+
+	cards.db.initialize(cache=cache, timer=timer)
+
+	with timer.phase("random_draft"):
+		deck1 = random_draft(hero=MAGE)
+		deck2 = random_draft(hero=WARRIOR)
+
+	with timer.phase("Game.start"):
+		player1 = Player("Player1", deck1, MAGE)
+		player2 = Player("Player2", deck2, WARRIOR)
+		game = Game(players=(player1, player2))
+		game.start()
+
+	return timer
+
+
+def parse_importtime(output):
+	"""
+	Parse the output of python -X importtime into a list of
+	{module, self_us, cumulative_us, depth}, in import completion order.
+	"""
+	ret = []
+	for line in output.splitlines():
+		if not line.startswith("import time:"):
+			continue
+		fields = line[len("import time:"):].split("|")
+		if len(fields) != 3 or not fields[0].strip().isdigit():
+			# Header line
+			continue
+		name = fields[2].rstrip()
+		module = name.lstrip()
+		ret.append({
+			"module": module,
+			"self_us": int(fields[0]),
+			"cumulative_us": int(fields[1]),
+			"depth": (len(name) - len(module) - 1) // 2,
+		})
+	return ret
+
+
+def importtime(cache=False):
+	"""
+	Run the benchmark in a child interpreter with -X importtime and
+	return the parsed import tree.
+	"""
+	if sys.version_info < (3, 7):
+		raise RuntimeError("-X importtime requires Python 3.7 or later")
+	# Not __name__, which is "__main__" when run with -m
+	args = [sys.executable, "-X", "importtime", "-m", "fireplace.bench.startup", "-o", os.devnull]
+	if cache:
+		args.append("--cache")
+	proc = subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+	return parse_importtime(proc.stderr.decode("utf-8"))
+
+
+def main():
+	arguments = ArgumentParser(prog="fireplace.bench.startup")
+	arguments.add_argument(
+		"--cache", action="store_true",
+		help="Use the card database cache: load it if there is one, write it otherwise"
+	)
+	arguments.add_argument(
+		"--importtime", action="store_true",
+		help="Include the import tree, measured in a separate interpreter"
+	)
+	arguments.add_argument("-o", "--output", help="Write the results to this file")
+	args = arguments.parse_args(sys.argv[1:])
+
+	timer = run(cache=args.cache)
+	results = {
+		"python": sys.version,
+		"phases": timer.phases,
+		"total": timer.total,
+	}
+	if args.importtime:
+		results["importtime"] = importtime(cache=args.cache)
+	dump(results, args.output)
+
+	return 0
+
+
+if __name__ == "__main__":
+	exit(main())
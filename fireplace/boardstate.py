@@ -0,0 +1,122 @@
+"""
+Fixed-shape array view of the game state, for evaluators.
+
+Requires numpy (the "numpy" extra).
+"""
+from . import cards
+try:
+	import numpy as np
+except ImportError as e:
+	raise ImportError("fireplace.boardstate requires numpy: pip install fireplace[numpy]") from e
+
+
+# Minion flags, as bits of the "keywords" feature
+KEYWORDS = (
+	"taunt", "divine_shield", "stealthed", "frozen", "charge", "windfury",
+	"poisonous", "silenced", "cant_attack", "enrage",
+)
+
+_card_indexes = {}
+
+
+def card_index(id):
+	"""
+	Returns the row of the card \a id in the card database, the same row
+	as in cards.table.CardTable.from_db().
+	"""
+	if len(_card_indexes) != len(cards.db):
+		_card_indexes.clear()
+		_card_indexes.update((id, i) for i, id in enumerate(dict.keys(cards.db)))
+	return _card_indexes[id]
+
+
+class BoardArrays:
+	"""
+	The heroes, boards and hands of a game in preallocated int32 arrays:
+	- heroes: (2, len(HERO_FEATURES))
+	- minions: (2, MAX_MINIONS, len(MINION_FEATURES)), in board order
+	- hands: (2, MAX_HAND, len(HAND_FEATURES)), in hand order
+	Row 0 of every array is the player the state was filled for, row 1 its
+	opponent. Empty minion and hand slots are zeroed, with a card of -1.
+	fill() overwrites the arrays in place: copy them to keep a state.
+	"""
+	HERO_FEATURES = (
+		"health", "max_health", "armor", "atk", "weapon_atk", "weapon_durability",
+		"mana", "max_mana", "hand_size", "deck_size", "fatigue_counter", "secrets",
+	)
+	MINION_FEATURES = ("card", "atk", "health", "max_health", "cost", "keywords")
+	HAND_FEATURES = ("card", "type", "cost", "atk", "health")
+	MAX_MINIONS = 7
+	MAX_HAND = 10
+	DTYPE = np.int32
+
+	def __init__(self):
+		self.heroes = np.zeros((2, len(self.HERO_FEATURES)), dtype=self.DTYPE)
+		self.minions = np.zeros((2, self.MAX_MINIONS, len(self.MINION_FEATURES)), dtype=self.DTYPE)
+		self.hands = np.zeros((2, self.MAX_HAND, len(self.HAND_FEATURES)), dtype=self.DTYPE)
+		self.num_minions = np.zeros(2, dtype=self.DTYPE)
+		self.num_cards = np.zeros(2, dtype=self.DTYPE)
+
+	def __repr__(self):
+		return "<%s: %r minions, %r cards>" % (
+			self.__class__.__name__, self.num_minions.tolist(), self.num_cards.tolist()
+		)
+
+	def fill(self, game, player=None):
+		"""
+		Overwrite the arrays with the state of \a game, seen by \a player
+		(defaults to the current player).
+		"""
+		if player is None:
+			player = game.current_player or game.players[0]
+		for i, p in enumerate((player, player.opponent)):
+			self._fill_hero(self.heroes[i], p)
+			self.num_minions[i] = self._fill_rows(self.minions[i], p.field, self._fill_minion)
+			self.num_cards[i] = self._fill_rows(self.hands[i], p.hand, self._fill_card)
+		return self
+
+	@staticmethod
+	def _fill_rows(rows, entities, fill_row):
+		count = min(len(entities), len(rows))
+		for i in range(count):
+			fill_row(rows[i], entities[i])
+		rows[count:] = 0
+		rows[count:, 0] = -1
+		return count
+
+	@staticmethod
+	def _fill_hero(row, player):
+		hero, weapon = player.hero, player.weapon
+		row[0] = hero.health
+		row[1] = hero.max_health
+		row[2] = hero.armor
+		row[3] = hero.atk
+		row[4] = weapon.atk if weapon else 0
+		row[5] = weapon.durability if weapon else 0
+		row[6] = player.mana
+		row[7] = player.max_mana
+		row[8] = len(player.hand)
+		row[9] = len(player.deck)
+		row[10] = player.fatigue_counter
+		row[11] = len(player.secrets)
+
+	@staticmethod
+	def _fill_minion(row, minion):
+		keywords = 0
+		for bit, attr in enumerate(KEYWORDS):
+			if getattr(minion, attr, False):
+				keywords |= 1 << bit
+		row[0] = card_index(minion.id)
+		row[1] = minion.atk
+		row[2] = minion.health
+		row[3] = minion.max_health
+		row[4] = minion.cost
+		row[5] = keywords
+
+	@staticmethod
+	def _fill_card(row, card):
+		row[0] = card_index(card.id)
+		row[1] = card.type
+		row[2] = card.cost
+		row[3] = getattr(card, "atk", 0)
+		row[4] = getattr(card, getattr(card, "health_attribute", "health"), 0)
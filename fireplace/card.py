@@ -14,20 +14,77 @@ THE_COIN = "GAME_005"
 
 def Card(id):
 	data = cards.db[id]
-	subclass = {
-		CardType.HERO: Hero,
-		CardType.MINION: Minion,
-		CardType.SPELL: Spell,
-		CardType.ENCHANTMENT: Enchantment,
-		CardType.WEAPON: Weapon,
-		CardType.HERO_POWER: HeroPower,
-	}[data.type]
-	if subclass is Spell and data.secret:
-		subclass = Secret
-	return subclass(data)
+	prototype = _prototypes.get(id)
+	if prototype is None or prototype.data is not data:
+		subclass = {
+			CardType.HERO: Hero,
+			CardType.MINION: Minion,
+			CardType.SPELL: Spell,
+			CardType.ENCHANTMENT: Enchantment,
+			CardType.WEAPON: Weapon,
+			CardType.HERO_POWER: HeroPower,
+		}[data.type]
+		if subclass is Spell and data.secret:
+			subclass = Secret
+		prototype = _prototypes[id] = CardPrototype(subclass, data)
+	return prototype.new()
+
+
+class CardPrototype:
+	"""
+	The initial state of the cards of one ID, computed once by running the
+	constructor of \a cls. New cards are created by copying that state.
+	Containers are shared between the cards until modified (events, buffs,
+	slots) or never modified (requirements, entourage); the containers
+	listed in \a FRESH are created for every card.
+	"""
+	FRESH = {
+		"_derived": dict,
+		"additional_deathrattles": list,
+		"choose_cards": CardList,
+	}
+
+	def __init__(self, cls, data):
+		self.cls = cls
+		self.data = data
+		template = cls(data)
+		self.slots = []
+		for klass in cls.__mro__:
+			for name in klass.__dict__.get("__slots__", ()):
+				if name in ("__dict__", "__weakref__") or name in self.FRESH:
+					continue
+				descriptor = klass.__dict__[name]
+				try:
+					value = descriptor.__get__(template, cls)
+				except AttributeError:
+					# Not set by the constructor
+					continue
+				self.slots.append((descriptor.__set__, value))
+		self.attributes = template.__dict__
+		self.fresh = [
+			(name, factory) for name, factory in self.FRESH.items() if hasattr(template, name)
+		]
+
+	def new(self):
+		ret = self.cls.__new__(self.cls)
+		for setter, value in self.slots:
+			setter(ret, value)
+		if self.attributes:
+			# Otherwise, leave the instance dict to be created on first use
+			ret.__dict__.update(self.attributes)
+		for name, factory in self.fresh:
+			setattr(ret, name, factory())
+		return ret
+
+
+_prototypes = {}
 
 
 class BaseCard(BaseEntity):
+	__slots__ = (
+		"data", "requirements", "id", "controller", "choose", "parent_card", "aura",
+		"heropower_damage", "_zone",
+	)
 	Manager = CardManager
 	delayed_destruction = False
 
@@ -42,7 +99,7 @@ class BaseCard(BaseEntity):
 		self.aura = False
 		self.heropower_damage = 0
 		self._zone = Zone.INVALID
-		self.tags.update(data.tags)
+		self.Manager.update_object(self, data.tags)
 
 	def __str__(self):
 		return self.name
@@ -72,6 +129,13 @@ class BaseCard(BaseEntity):
 	def zone(self, value):
 		self._set_zone(value)
 
+	def _numbered(self):
+		"""
+		Called once the card has its entity_id, which its first zone
+		change happens before: index it in the game.
+		"""
+		self.game.listeners.register(self)
+
 	def _set_zone(self, value):
 		old = self.zone
 
@@ -93,10 +157,19 @@ class BaseCard(BaseEntity):
 		if caches.get(value) is not None:
 			caches[value].append(self)
 		self._zone = value
+		self.game.zone_version += 1
+		self.game.listeners.register(self)
 
+		entity_id = getattr(self, "entity_id", None)
 		if value == Zone.PLAY:
 			self.play_counter = self.game.play_counter
 			self.game.play_counter += 1
+			# Keep the entity index in play_counter order
+			if entity_id in self.game.entity_by_id:
+				self.game.entity_by_id.move_to_end(entity_id)
+		elif value == Zone.REMOVEDFROMGAME:
+			# Removed entities don't come back: don't keep (and copy) them
+			self.game.entity_by_id.pop(entity_id, None)
 
 	def buff(self, target, buff, **kwargs):
 		"""
@@ -110,8 +183,11 @@ class BaseCard(BaseEntity):
 		ret = self.controller.card(buff, self)
 		ret.source = self
 		ret.apply(target)
-		for k, v in kwargs.items():
-			setattr(ret, k, v)
+		if kwargs:
+			for k, v in kwargs.items():
+				setattr(ret, k, v)
+			# The target cached the buff's values when it was applied
+			ret._invalidate_derived()
 		return ret
 
 	def is_playable(self) -> bool:
@@ -126,6 +202,10 @@ class BaseCard(BaseEntity):
 
 
 class PlayableCard(BaseCard, Entity, TargetableByAuras):
+	__slots__ = (
+		"cant_play", "entourage", "has_battlecry", "has_combo", "overload", "target",
+		"rarity", "choose_cards", "morphed",
+	)
 	windfury = int_property("windfury")
 	playable_zone = Zone.HAND
 
@@ -163,6 +243,7 @@ class PlayableCard(BaseCard, Entity, TargetableByAuras):
 	@cost.setter
 	def cost(self, value):
 		self._cost = value
+		self._invalidate_derived()
 
 	@property
 	def powered_up(self):
@@ -322,6 +403,9 @@ class PlayableCard(BaseCard, Entity, TargetableByAuras):
 
 
 class LiveEntity(PlayableCard, Entity):
+	__slots__ = (
+		"_to_be_destroyed", "_damage", "forgetful", "predamage", "turns_in_play", "turn_killed",
+	)
 	has_deathrattle = boolean_property("has_deathrattle")
 	atk = int_property("atk")
 	cant_be_damaged = boolean_property("cant_be_damaged")
@@ -344,6 +428,48 @@ class LiveEntity(PlayableCard, Entity):
 		self._to_be_destroyed = False
 		if zone == Zone.GRAVEYARD:
 			self.turn_killed = self.game.turn
+		if zone == Zone.PLAY:
+			self._health_changed()
+		else:
+			self.game.death_watch.pop(getattr(self, "entity_id", None), None)
+
+	def _numbered(self):
+		super()._numbered()
+		self._health_changed()
+
+	@property
+	def damage(self):
+		return self._damage
+
+	@damage.setter
+	def damage(self, value):
+		self._damage = value
+		self._health_changed()
+
+	def _health_changed(self):
+		"""
+		Queue the entity for the next death check (see BaseGame.process_deaths())
+		"""
+		if self._zone == Zone.PLAY:
+			entity_id = getattr(self, "entity_id", None)
+			if entity_id is not None:
+				self.game.death_candidates[entity_id] = self
+
+	def _modifiers_changed(self):
+		self._health_changed()
+
+	@property
+	def dynamic_health(self):
+		"""
+		True if a script computes the entity's health: it can then drop
+		without any of its values, buffs or auras changing.
+		"""
+		if hasattr(self.data.scripts, "max_health"):
+			return True
+		ledger = self._derived.get("max_health")
+		if ledger is None or None in ledger:
+			return True
+		return len(ledger[0]) > 1 or len(ledger[1]) > 1
 
 	@property
 	def immune(self):
@@ -383,6 +509,7 @@ class LiveEntity(PlayableCard, Entity):
 	@to_be_destroyed.setter
 	def to_be_destroyed(self, value):
 		self._to_be_destroyed = value
+		self._health_changed()
 
 	@property
 	def killed_this_turn(self):
@@ -397,6 +524,7 @@ class LiveEntity(PlayableCard, Entity):
 
 
 class Character(LiveEntity):
+	__slots__ = ("frozen", "attack_target", "cannot_attack_heroes", "num_attacks", "race")
 	health_attribute = "health"
 	cant_attack = boolean_property("cant_attack")
 	cant_be_targeted_by_opponents = boolean_property("cant_be_targeted_by_opponents")
@@ -421,6 +549,11 @@ class Character(LiveEntity):
 			ret += rules.HEAVILY_ARMORED
 		return ret
 
+	@property
+	def all_events(self):
+		# Buffs can make the character heavily armored at any time
+		return list(super().all_events) + rules.HEAVILY_ARMORED
+
 	@property
 	def attackable(self):
 		return not self.immune
@@ -498,6 +631,8 @@ class Character(LiveEntity):
 
 
 class Hero(Character):
+	__slots__ = ("armor", "power")
+
 	def __init__(self, data):
 		self.armor = 0
 		self.power = None
@@ -550,6 +685,10 @@ class Hero(Character):
 
 
 class Minion(Character):
+	__slots__ = (
+		"always_wins_brawls", "divine_shield", "enrage", "poisonous", "silenced",
+		"_summon_index",
+	)
 	charge = boolean_property("charge")
 	has_inspire = boolean_property("has_inspire")
 	spellpower = int_property("spellpower")
@@ -665,6 +804,8 @@ class Minion(Character):
 
 
 class Spell(PlayableCard):
+	__slots__ = ("immune_to_spellpower", "receives_double_spelldamage_bonus")
+
 	def __init__(self, data):
 		self.immune_to_spellpower = False
 		self.receives_double_spelldamage_bonus = False
@@ -680,6 +821,8 @@ class Spell(PlayableCard):
 
 
 class Secret(Spell):
+	__slots__ = ()
+
 	@property
 	def events(self):
 		ret = super().events
@@ -687,6 +830,15 @@ class Secret(Spell):
 			ret += self.data.scripts.secret
 		return ret
 
+	@property
+	def all_events(self):
+		ret = super().all_events
+		if self.zone == Zone.SECRET and self.exhausted:
+			# Listens again once the turn changes
+			ret = list(ret)
+			ret += self.data.scripts.secret
+		return ret
+
 	@property
 	def exhausted(self):
 		return self.zone == Zone.SECRET and self.controller.current_player
@@ -715,6 +867,7 @@ class Secret(Spell):
 
 
 class Enchantment(BaseCard):
+	__slots__ = ("one_turn_effect", "additional_deathrattles", "owner", "tick", "aura_key")
 	atk = int_property("atk")
 	cost = int_property("cost")
 	has_deathrattle = boolean_property("has_deathrattle")
@@ -746,15 +899,25 @@ class Enchantment(BaseCard):
 		i += getattr(self, "_" + attr, 0)
 		return getattr(self.data.scripts, attr, lambda s, x: x)(self, i)
 
+	def _static_delta(self, attr):
+		if hasattr(self.data.scripts, attr):
+			return None
+		return getattr(self, "_" + attr, 0)
+
+	def _invalidate_derived(self):
+		owner = getattr(self, "owner", None)
+		if owner is not None:
+			owner._invalidate_derived()
+
 	def _set_zone(self, zone):
 		if zone == Zone.PLAY:
-			self.owner.buffs.append(self)
+			self.owner.add_buff(self)
 		elif zone == Zone.REMOVEDFROMGAME:
 			if self.zone == zone:
 				# Can happen if a Destroy is queued after a bounce, for example
 				self.logger.warning("Trying to remove %r which is already gone", self)
 				return
-			self.owner.buffs.remove(self)
+			self.owner.remove_buff(self)
 			if self in self.game.active_aura_buffs:
 				self.game.active_aura_buffs.remove(self)
 		super()._set_zone(zone)
@@ -774,6 +937,7 @@ class Enchantment(BaseCard):
 
 
 class Weapon(rules.WeaponRules, LiveEntity):
+	__slots__ = ()
 	health_attribute = "durability"
 
 	def __init__(self, *args):
@@ -793,6 +957,7 @@ class Weapon(rules.WeaponRules, LiveEntity):
 	@max_durability.setter
 	def max_durability(self, value):
 		self._max_durability = value
+		self._health_changed()
 
 	@property
 	def exhausted(self):
@@ -810,6 +975,7 @@ class Weapon(rules.WeaponRules, LiveEntity):
 
 
 class HeroPower(PlayableCard):
+	__slots__ = ("activations_this_turn", )
 	additional_activations = int_property("additional_activations")
 	playable_zone = Zone.PLAY
 
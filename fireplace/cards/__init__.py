@@ -1,15 +1,91 @@
+import hashlib
 import os
-from pkg_resources import resource_filename
+import pickle
+import sys
+import tempfile
+from copy import copy
+from functools import lru_cache
+from pkg_resources import get_distribution
 from hearthstone import cardxml
 from hearthstone.enums import CardType
 from ..logging import log
 from ..rules import POISONOUS
-from ..utils import get_script_definition
+from ..utils import get_script_definition, script_registry, untimed_phase
+from .slim import SlimCard
+
+
+def _default_cache_dir():
+	cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+	return os.environ.get("FIREPLACE_CACHE_DIR", os.path.join(cache_home, "fireplace"))
+
+
+# Cache directory -> the last cache file this process wrote in it
+_written_caches = {}
 
 
 class CardDB(dict):
+	# Where the parsed card database is cached between processes.
+	# Set to None (or FIREPLACE_CACHE_DIR to an empty string) to disable.
+	cache_dir = _default_cache_dir() or None
+
+	# Maximum amount of filter() queries to remember
+	FILTER_CACHE_SIZE = 1024
+
 	def __init__(self):
 		self.initialized = False
+		self.lazy = False
+		self.simulation = False
+		# IDs of the cards which have not been merged yet (lazy mode)
+		self._unmerged = set()
+		# attr -> {value: set of card IDs}, built the first time attr is filtered on
+		self._indexes = {}
+		# card ID -> position in the database, used to keep filter() results ordered
+		self._positions = None
+		self._cached_filter = lru_cache(maxsize=self.FILTER_CACHE_SIZE)(self._filter)
+
+	def __getitem__(self, id):
+		try:
+			card = super().__getitem__(id)
+		except KeyError:
+			if not self.lazy or id not in script_registry.index:
+				raise
+			# Custom cards are only added once their card set is imported
+			script_registry.lookup(id)
+			card = super().__getitem__(id)
+		if id in self._unmerged:
+			carddef = script_registry.lookup(id)
+			# Importing its card set may have replaced the card (custom cards)
+			card = super().__getitem__(id)
+			if id in self._unmerged:
+				self.merge(id, card, carddef)
+				self._unmerged.discard(id)
+		return card
+
+	def __setitem__(self, id, card):
+		self._unmerged.discard(id)
+		super().__setitem__(id, card)
+		self.invalidate_filters()
+
+	def get(self, id, default=None):
+		try:
+			return self[id]
+		except KeyError:
+			return default
+
+	def items(self):
+		self.merge_all()
+		return super().items()
+
+	def values(self):
+		self.merge_all()
+		return super().values()
+
+	def merge_all(self):
+		"""
+		Merge every card which hasn't been merged yet (lazy mode)
+		"""
+		for id in list(self._unmerged):
+			self[id]
 
 	@staticmethod
 	def merge(id, card, carddef=None):
@@ -85,14 +161,189 @@ class CardDB(dict):
 
 		return card
 
-	def initialize(self):
+	@staticmethod
+	def cache_key():
+		"""
+		Return a key identifying the current card data and card scripts.
+		The key changes whenever the hearthstone package is upgraded or
+		any source file in fireplace.cards is modified.
+		"""
+		sha = hashlib.sha1()
+		sha.update(get_distribution("hearthstone").version.encode("utf-8"))
+		sha.update(("%i.%i" % sys.version_info[:2]).encode("utf-8"))
+		basedir = os.path.dirname(__file__)
+		for dirpath, dirnames, filenames in os.walk(basedir):
+			dirnames.sort()
+			for filename in sorted(filenames):
+				if not filename.endswith(".py"):
+					continue
+				path = os.path.join(dirpath, filename)
+				sha.update(os.path.relpath(path, basedir).encode("utf-8"))
+				with open(path, "rb") as f:
+					sha.update(f.read())
+		return sha.hexdigest()
+
+	def _cache_path(self, key):
+		return os.path.join(self.cache_dir, "carddb-%s.pickle" % (key))
+
+	def load_cache(self, key):
+		"""
+		Return the cached card database matching \a key, or None if
+		there is no usable cache.
+		"""
+		path = self._cache_path(key)
+		try:
+			with open(path, "rb") as f:
+				cached_key, cards = pickle.load(f)
+		except FileNotFoundError:
+			return None
+		except Exception as e:
+			log.warning("Could not read card database cache %r: %s", path, e)
+			return None
+
+		if cached_key != key:
+			log.warning("Ignoring stale card database cache %r", path)
+			return None
+
+		return cards
+
+	def save_cache(self, key):
+		"""
+		Write the merged card database to the cache.
+		Card scripts cannot be pickled (they hold DSL lambdas), so they are
+		stripped here and rebuilt by merge() when the cache is loaded.
+		"""
+		cards = {}
+		for id, card in super().items():
+			card = copy(card)
+			if hasattr(card, "scripts"):
+				del card.scripts
+			cards[id] = card
+
+		tmp = None
+		try:
+			os.makedirs(self.cache_dir, exist_ok=True)
+			fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+			with os.fdopen(fd, "wb") as f:
+				pickle.dump((key, cards), f, pickle.HIGHEST_PROTOCOL)
+			# Atomic, so that concurrent workers never see a partial cache
+			path = self._cache_path(key)
+			os.replace(tmp, path)
+		except (OSError, pickle.PicklingError) as e:
+			log.warning("Could not write card database cache to %r: %s", self.cache_dir, e)
+			if tmp is not None and os.path.exists(tmp):
+				os.remove(tmp)
+			return
+
+		# Clean up the cache this process wrote for older card data or
+		# scripts. Other processes may still be using theirs.
+		old = _written_caches.get(self.cache_dir)
+		if old is not None and old != path:
+			try:
+				os.remove(old)
+			except OSError:
+				pass
+		_written_caches[self.cache_dir] = path
+
+	def initialize(self, cache=True, lazy=False, simulation=False, timer=None):
+		"""
+		Load the card database.
+		In \a lazy mode, cards are only merged with their script definition
+		the first time they are looked up, and a card set package is only
+		imported once one of its cards is needed. filter() works from the card
+		data and does not merge the cards it goes through.
+		In \a simulation mode, the cards are stored as compact SlimCard objects
+		without their localized strings (names, texts, flavor...). Custom
+		cards are not slimmed.
+		If given, \a timer (a bench.PhaseTimer) times each loading phase.
+		"""
 		log.info("Initializing card database")
+		phase = timer.phase if timer is not None else untimed_phase
 		self.initialized = True
-		db, xml = cardxml.load()
-		for id, card in db.items():
-			self[id] = self.merge(id, card)
+		self.lazy = lazy
+		self.simulation = simulation
+		cache = cache and self.cache_dir
+		db = None
+		if cache:
+			key = self.cache_key()
+			with phase("load cache"):
+				db = self.load_cache(key)
+
+		if not lazy:
+			# In lazy mode, card sets are only imported as their cards are needed
+			script_registry.load(timer)
+		if db is None:
+			with phase("cardxml.load"):
+				db, xml = cardxml.load()
+		else:
+			log.info("Loaded %i cards from cache", len(db))
+			cache = False
+
+		if lazy:
+			self.update(db)
+			self._unmerged.update(db)
+			self.invalidate_filters()
+		else:
+			with phase("CardDB.merge", cards=len(db)):
+				for id, card in db.items():
+					self[id] = self.merge(id, card, script_registry.get(id))
 
-		log.info("Merged %i cards", len(self))
+		if cache:
+			with phase("save cache"):
+				self.save_cache(key)
+
+		if simulation:
+			# After saving the cache, which keeps the full card data.
+			# Only the loaded cards: custom cards, added as their card set
+			# is imported, keep their CardXML (and their fake names).
+			with phase("slim cards", cards=len(db)):
+				for id in db:
+					super().__setitem__(id, SlimCard.from_card(super().__getitem__(id)))
+			self.invalidate_filters()
+
+		if lazy:
+			log.info("Loaded %i cards, merging on demand", len(self))
+		else:
+			log.info("Merged %i cards", len(self))
+
+	def invalidate_filters(self):
+		"""
+		Forget the filter() indexes and results, after the database changed
+		"""
+		if self._positions is not None:
+			self._indexes.clear()
+			self._positions = None
+			self._cached_filter.cache_clear()
+
+	def _index(self, attr):
+		index = self._indexes.get(attr)
+		if index is None:
+			index = self._indexes[attr] = {}
+			# Filter from the card data, without merging cards in lazy mode
+			for id, card in super().items():
+				index.setdefault(getattr(card, attr), set()).add(id)
+		return index
+
+	def _filter(self, query):
+		if self._positions is None:
+			self._positions = {id: i for i, id in enumerate(super().keys())}
+
+		ids = None
+		for attr, value, is_list in query:
+			index = self._index(attr)
+			if is_list:
+				matches = set()
+				for v in value:
+					matches.update(index.get(v, ()))
+			else:
+				matches = index.get(value, ())
+			ids = set(matches) if ids is None else ids.intersection(matches)
+			if not ids:
+				return ()
+
+		if ids is None:
+			return tuple(super().keys())
+		return tuple(sorted(ids, key=self._positions.__getitem__))
 
 	def filter(self, **kwargs):
 		"""
@@ -105,25 +356,23 @@ class CardDB(dict):
 		\a race: The race (tribe) of the card (hearthstone.enums.Race)
 		\a rarity: The rarity of the card (hearthstone.enums.Rarity)
 		\a cost: The mana cost of the card
+		A list of values matches any of the values in the list.
 		"""
 		if not self.initialized:
 			self.initialize()
 
-		cards = self.values()
-
 		if "type" not in kwargs:
 			kwargs["type"] = [CardType.SPELL, CardType.WEAPON, CardType.MINION]
 
-		for attr, value in kwargs.items():
+		query = []
+		for attr, value in sorted(kwargs.items()):
 			if value is not None:
-				# What? this doesn't work?
-				# cards = __builtins__["filter"](lambda c: getattr(c, attr) == value, cards)
-				cards = [
-					card for card in cards if (isinstance(value, list) and getattr(card, attr) in value) or
-					getattr(card, attr) == value
-				]
-
-		return [card.id for card in cards]
+				if isinstance(value, list):
+					query.append((attr, tuple(value), True))
+				else:
+					query.append((attr, value, False))
+
+		return list(self._cached_filter(tuple(query)))
 
 
 # Here we import every card from every set and load the cardxml database.
@@ -0,0 +1,97 @@
+"""
+Compact card data for the simulation mode of CardDB.
+"""
+from types import MappingProxyType
+from hearthstone.enums import CardClass, CardSet, CardType, GameTag, Race, Rarity
+from ..managers import CARD_ATTRIBUTE_MAP
+
+
+# Tags which aren't mapped to an engine attribute, but are used to filter cards
+FILTER_TAGS = {
+	"collectible": GameTag.Collectible,
+	"card_set": GameTag.CARD_SET,
+	"spare_part": GameTag.SPARE_PART,
+}
+
+# CardXML attribute -> tag, for the attributes a SlimCard can answer
+ATTRIBUTE_TAGS = {attr: tag for tag, attr in CARD_ATTRIBUTE_MAP.items() if attr}
+ATTRIBUTE_TAGS.update(FILTER_TAGS)
+ATTRIBUTE_TAGS.update({
+	"battlecry": GameTag.BATTLECRY,
+	"deathrattle": GameTag.DEATHRATTLE,
+	"durability": GameTag.DURABILITY,
+	"health": GameTag.HEALTH,
+})
+
+ATTRIBUTE_TYPES = {
+	"card_class": CardClass,
+	"card_set": CardSet,
+	"race": Race,
+	"rarity": Rarity,
+	"type": CardType,
+}
+
+KEPT_TAGS = frozenset(ATTRIBUTE_TAGS.values())
+
+_NO_REQUIREMENTS = MappingProxyType({})
+
+
+class SlimCard:
+	"""
+	Card data stripped down to what a headless simulation reads: the tags
+	mapped to engine attributes, a few tags filter() uses, requirements,
+	entourage and scripts. Localized strings are dropped.
+	Tag-backed CardXML attributes (cost, collectible, race...) are looked up
+	in \a tags on access.
+	"""
+	__slots__ = ("id", "tags", "requirements", "entourage", "hero_power", "choose_cards", "scripts")
+
+	def __init__(self, id):
+		self.id = id
+		self.tags = {}
+		self.requirements = _NO_REQUIREMENTS
+		self.entourage = ()
+		self.hero_power = None
+		self.choose_cards = []
+
+	def __str__(self):
+		return str(self.tags.get(GameTag.CARDNAME) or self.id)
+
+	def __repr__(self):
+		return "<%s: %r>" % (self.__class__.__name__, self.id)
+
+	def __deepcopy__(self, memo):
+		# Card data is shared between the copies of a game (and holds
+		# mappingproxies, which can't be copied)
+		return self
+
+	def __getattr__(self, attr):
+		# Only reached when attr is not a slot, which also keeps
+		# copy and pickle from recursing through self.tags.
+		tag = ATTRIBUTE_TAGS.get(attr)
+		if tag is None:
+			raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, attr))
+		value = self.tags.get(tag, 0)
+		if attr in ATTRIBUTE_TYPES:
+			try:
+				return ATTRIBUTE_TYPES[attr](value)
+			except ValueError:
+				pass
+		return value
+
+	@classmethod
+	def from_card(cls, card):
+		"""
+		Return the SlimCard of the CardXML \a card (merged or not)
+		"""
+		ret = cls(card.id)
+		ret.tags = {tag: value for tag, value in card.tags.items() if tag in KEPT_TAGS}
+		if card.requirements:
+			ret.requirements = MappingProxyType(dict(card.requirements))
+		ret.entourage = tuple(card.entourage)
+		ret.hero_power = card.hero_power
+		if hasattr(card, "choose_cards"):
+			ret.choose_cards = card.choose_cards
+		if hasattr(card, "scripts"):
+			ret.scripts = card.scripts
+		return ret
@@ -0,0 +1,110 @@
+"""
+Columnar, array-backed view of the card database.
+
+Requires numpy (the "numpy" extra).
+"""
+import os
+from hearthstone.enums import CardType
+try:
+	import numpy as np
+except ImportError as e:
+	raise ImportError("fireplace.cards.table requires numpy: pip install fireplace[numpy]") from e
+
+
+class CardTable:
+	"""
+	A read-only table of card attributes, with one array per column.
+	Row \a i of every column describes the card \a ids[i]; rows are in
+	card database order.
+	"""
+	COLUMNS = (
+		"cost", "atk", "health", "type", "race", "rarity", "card_class", "card_set",
+		"collectible",
+	)
+	DTYPE = np.int32
+
+	def __init__(self, ids, columns):
+		self.ids = ids
+		self.columns = columns
+		for array in (ids, ) + tuple(columns.values()):
+			array.flags.writeable = False
+
+	def __len__(self):
+		return len(self.ids)
+
+	def __getitem__(self, attr):
+		return self.columns[attr]
+
+	def __repr__(self):
+		return "<%s (%i cards)>" % (self.__class__.__name__, len(self))
+
+	@classmethod
+	def from_db(cls, db=None):
+		"""
+		Build a table from the card database \a db (defaults to cards.db).
+		Like CardDB.filter(), this reads the card data without merging
+		cards of a lazy database.
+		"""
+		if db is None:
+			from . import db
+		if not db.initialized:
+			db.initialize()
+
+		cards = list(dict.values(db))
+		ids = np.array([card.id for card in cards])
+		columns = {}
+		for attr in cls.COLUMNS:
+			columns[attr] = np.fromiter(
+				(int(getattr(card, attr) or 0) for card in cards), dtype=cls.DTYPE, count=len(cards)
+			)
+		return cls(ids, columns)
+
+	@classmethod
+	def load(cls, path, mmap=True):
+		"""
+		Load a table saved with save() from the directory \a path.
+		If \a mmap is True, the arrays are memory-mapped read-only and
+		their pages are shared between all the processes using them.
+		"""
+		mmap_mode = "r" if mmap else None
+		ids = np.load(os.path.join(path, "id.npy"), mmap_mode=mmap_mode)
+		columns = {}
+		for attr in cls.COLUMNS:
+			columns[attr] = np.load(os.path.join(path, attr + ".npy"), mmap_mode=mmap_mode)
+		return cls(ids, columns)
+
+	def save(self, path):
+		"""
+		Save the table as one .npy file per column in the directory \a path.
+		"""
+		os.makedirs(path, exist_ok=True)
+		np.save(os.path.join(path, "id.npy"), self.ids)
+		for attr, array in self.columns.items():
+			np.save(os.path.join(path, attr + ".npy"), array)
+
+	def mask(self, **kwargs):
+		"""
+		Returns a boolean array of the rows matching the given filters.
+		Filters work like CardDB.filter(): None values are ignored and a
+		list of values matches any of the values in the list.
+		"""
+		ret = np.ones(len(self), dtype=bool)
+		for attr, value in kwargs.items():
+			if value is None:
+				continue
+			column = self.columns[attr]
+			if isinstance(value, list):
+				ret &= np.isin(column, [int(v) for v in value])
+			else:
+				ret &= column == int(value)
+		return ret
+
+	def filter(self, **kwargs):
+		"""
+		Returns the list of card IDs matching the given filters, the same
+		list CardDB.filter() returns for the same arguments.
+		"""
+		if "type" not in kwargs:
+			kwargs["type"] = [CardType.SPELL, CardType.WEAPON, CardType.MINION]
+
+		return self.ids[self.mask(**kwargs)].tolist()
@@ -0,0 +1,50 @@
+"""
+Game clocks: the source of the timestamps a game records (turn starts)
+and of the time turn timeouts are measured against.
+"""
+import time
+
+
+class VirtualClock:
+	"""
+	Simulated time, in seconds since \a start. It only moves when
+	advance() is called, so simulations never ask the system for the time
+	and replay identically.
+	"""
+	def __init__(self, start=0):
+		self.time = start
+
+	def __repr__(self):
+		return "<%s: %r>" % (self.__class__.__name__, self.time)
+
+	def now(self):
+		return self.time
+
+	def advance(self, seconds):
+		self.time += seconds
+
+
+class WallClock:
+	"""
+	The system time, as a UNIX timestamp in whole seconds.
+	"""
+	def __repr__(self):
+		return "<%s>" % (self.__class__.__name__)
+
+	def now(self):
+		return int(time.time())
+
+
+class FrozenClock(VirtualClock):
+	"""
+	A clock set from outside, for replays: set() it to each recorded
+	timestamp before replaying what happened at that time.
+	The engine only reads clocks, so it can replace a VirtualClock in any
+	game; advance() raises RuntimeError instead of drifting from the
+	recorded times.
+	"""
+	def set(self, time):
+		self.time = time
+
+	def advance(self, seconds):
+		raise RuntimeError("%r can only be set()" % (self))
@@ -0,0 +1,87 @@
+"""
+Random deck drafting
+"""
+import random
+from hearthstone.enums import CardClass, Rarity
+from . import cards
+from .deck import Deck
+
+
+class DraftPool:
+	"""
+	The collection a hero drafts from: every collectible card of the hero's
+	class and every neutral collectible card, along with how many copies of
+	each card a deck may contain.
+	"""
+	def __init__(self, ids, copies):
+		self.ids = ids
+		self.copies = copies
+
+	def __len__(self):
+		return len(self.ids)
+
+	def __repr__(self):
+		return "<%s (%i cards)>" % (self.__class__.__name__, len(self))
+
+	@classmethod
+	def from_class(cls, card_class, exclude=()):
+		ids = cards.filter(collectible=True, card_class=[CardClass.INVALID, card_class])
+		legendaries = set(cards.filter(collectible=True, rarity=Rarity.LEGENDARY))
+		ids = [id for id in ids if id not in exclude]
+		copies = [
+			Deck.MAX_UNIQUE_LEGENDARIES if id in legendaries else Deck.MAX_UNIQUE_CARDS
+			for id in ids
+		]
+		return cls(ids, copies)
+
+	def draft(self, count=Deck.MAX_CARDS, rng=random):
+		"""
+		Return a list of \a count random card IDs from the pool, respecting
+		the copy limits. Every pick is uniform over the cards which can still
+		be added to the deck.
+		"""
+		ids = list(self.ids)
+		copies = list(self.copies)
+		deck = []
+		while len(deck) < count:
+			if not ids:
+				raise ValueError("Not enough cards in %r to draft %i cards" % (self, count))
+			i = rng.randrange(len(ids))
+			deck.append(ids[i])
+			copies[i] -= 1
+			if not copies[i]:
+				# Swap the exhausted card out of the way
+				ids[i], copies[i] = ids[-1], copies[-1]
+				ids.pop()
+				copies.pop()
+		return deck
+
+
+_pools = {}
+
+
+def get_pool(hero, exclude=()):
+	"""
+	Return the (cached) DraftPool of the \a hero's collection, without the
+	cards in \a exclude.
+	"""
+	card_class = cards.db[hero].card_class
+	key = (card_class, frozenset(exclude))
+	if key not in _pools:
+		_pools[key] = DraftPool.from_class(card_class, key[1])
+	return _pools[key]
+
+
+def random_draft(hero, exclude=(), rng=random):
+	"""
+	Return a deck of 30 random cards from the \a hero's collection
+	"""
+	return get_pool(hero, exclude).draft(rng=rng)
+
+
+def random_drafts(hero, count, exclude=(), rng=random):
+	"""
+	Return a list of \a count random decks from the \a hero's collection
+	"""
+	pool = get_pool(hero, exclude)
+	return [pool.draft(rng=rng) for i in range(count)]
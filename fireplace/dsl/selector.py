@@ -25,6 +25,14 @@ class Selector:
 	Set operations preserve ordering (necessary for cards like Echo of
 	Medivh, where ordering matters)
 	"""
+	# True if eval() tests each entity on its own, returning a subsequence
+	# of the entities it is given
+	is_filter = False
+	# True if the selection only depends on the zones, zone positions,
+	# controllers and card types/races of entities: it can't change until
+	# an entity changes zone (see BaseGame.zone_version)
+	structural = False
+
 	def eval(self, entities: List[BaseEntity], source: BaseEntity) -> List[BaseEntity]:
 		return entities
 
@@ -61,9 +69,15 @@ class Selector:
 
 
 class EnumSelector(Selector):
+	is_filter = True
+
 	def __init__(self, tag_enum=None):
 		self.tag_enum = tag_enum
 
+	@property
+	def structural(self):
+		return isinstance(self.tag_enum, (CardType, Race, Rarity, Zone))
+
 	def eval(self, entities, source):
 		if not self.tag_enum or not hasattr(self.tag_enum, "test"):
 			raise RuntimeError("Unsupported enum type {}".format(str(self.tag_enum)))
@@ -133,11 +147,22 @@ NUM_ATTACKS_THIS_TURN = AttrValue(GameTag.NUM_ATTACKS_THIS_TURN)
 class ComparisonSelector(Selector):
 	"""A ComparisonSelector compares values of entities to
 	other values. Lazy values are evaluated at selector runtime."""
+	is_filter = True
+
 	def __init__(self, op: BinaryOp, left: SelectorEntityValue, right):
 		self.op = op
 		self.left = left
 		self.right = right
 
+	@property
+	def structural(self):
+		# FRIENDLY, ENEMY, CONTROLLED_BY(...)
+		return (
+			isinstance(self.left, AttrValue) and self.left.tag == GameTag.CONTROLLER and
+			isinstance(self.right, Controller) and
+			(self.right.child is None or self.right.child.structural)
+		)
+
 	def eval(self, entities, source):
 		right_value = (self.right.evaluate(source)
 					   if isinstance(self.right, LazyValue)
@@ -164,21 +189,25 @@ class ComparisonSelector(Selector):
 
 
 class FilterSelector(Selector):
-	def __init__(self, func: Callable[[BaseEntity, BaseEntity], bool]):
+	is_filter = True
+
+	def __init__(self, func: Callable[[BaseEntity, BaseEntity], bool], structural=False):
 		"""
 		func(entity, source) returns true iff the entity
 		should be selected
 		"""
 		self.func = func
+		self.structural = structural
 
 	def eval(self, entities, source):
 		return [e for e in entities if self.func(e, source)]
 
 
 class FuncSelector(Selector):
-	def __init__(self, func: Callable[[List[BaseEntity], BaseEntity], List[BaseEntity]]):
+	def __init__(self, func: Callable[[List[BaseEntity], BaseEntity], List[BaseEntity]], structural=False):
 		"""func(entities, source) returns the results"""
 		self.func = func
+		self.structural = structural
 
 	def eval(self, entities, source):
 		return self.func(entities, source)
@@ -192,6 +221,10 @@ class SliceSelector(Selector):
 		self.child = child
 		self.slice = slice_val
 
+	@property
+	def structural(self):
+		return self.child.structural
+
 	def eval(self, entities, source):
 		return list(self.child.eval(entities, source)[self.slice])
 
@@ -200,18 +233,103 @@ class SliceSelector(Selector):
 
 
 class SetOpSelector(Selector):
+	# Check planned evaluations against a full scan of the game
+	verify_plans = False
+
 	def __init__(self, op: Callable, left: Selector, right: SelectorLike):
 		if isinstance(right, LazyValue):
 			right = LazyValueSelector(right)
 		self.op = op
 		self.left = left
 		self.right = right
+		self._terms = None
 
 	@staticmethod
 	def _entity_id_set(entities: Iterable[BaseEntity]) -> Set[BaseEntity]:
 		return set(e.entity_id for e in entities if e)
 
+	@property
+	def is_filter(self) -> bool:
+		return self.left.is_filter and self.right.is_filter
+
+	@property
+	def structural(self):
+		return self.left.structural and self.right.structural
+
+	@property
+	def terms(self):
+		"""
+		The selector as an intersection: a list of (selector, negated) terms
+		"""
+		if self._terms is None:
+			if self.op is operator.and_:
+				self._terms = _terms(self.left) + _terms(self.right)
+			elif self.op is operator.sub:
+				self._terms = _terms(self.left) + [(self.right, True)]
+			else:
+				self._terms = [(self, False)]
+		return self._terms
+
+	def _candidates(self, game, source):
+		"""
+		Returns the entities of \a game the terms restrict the selection to,
+		in game order, read from the players' zones, or None if the terms
+		don't constrain the zone (and card type, in play) enough.
+		"""
+		zone, types, players = None, set(), game.players
+		for selector, negated in self.terms:
+			if negated:
+				continue
+			if isinstance(selector, EnumSelector):
+				if isinstance(selector.tag_enum, Zone):
+					zone = selector.tag_enum
+				elif isinstance(selector.tag_enum, CardType):
+					types = {selector.tag_enum}
+			elif _card_types(selector):
+				types = _card_types(selector)
+			elif (
+				isinstance(selector, ComparisonSelector) and selector.op is operator.eq and
+				isinstance(selector.left, AttrValue) and selector.left.tag == GameTag.CONTROLLER and
+				isinstance(selector.right, Controller) and selector.right.child is None
+			):
+				players = [selector.right.evaluate(source)]
+
+		if zone is None:
+			return None
+		ret = []
+		for player in players:
+			entities = player.zone_entities(zone, types)
+			if entities is None:
+				return None
+			ret += entities
+		return ret
+
+	def _eval_planned(self, game, candidates, source):
+		for selector, negated in self.terms:
+			if selector.is_filter:
+				# Filters test each entity on its own: only test the candidates
+				selected = selector.eval(candidates, source)
+				if not negated:
+					candidates = selected
+					continue
+			else:
+				selected = selector.eval(game, source)
+			ids = self._entity_id_set(selected)
+			candidates = [e for e in candidates if (e.entity_id in ids) != negated]
+		return candidates
+
 	def eval(self, entities, source):
+		if getattr(entities, "type", None) == CardType.GAME and self.op is not operator.or_:
+			candidates = self._candidates(entities, source)
+			if candidates is not None:
+				ret = self._eval_planned(entities, candidates, source)
+				if self.verify_plans and all(s.is_filter for s, n in self.terms):
+					expected = self._eval_scan(entities, source)
+					assert ret == expected, "%r: %r != %r" % (self, ret, expected)
+				return ret
+		return self._eval_scan(entities, source)
+
+	def _eval_scan(self, entities, source):
 		left_children = self.left.eval(entities, source)
 		right_children = self.right.eval(entities, source)
 		result_entity_ids = self.op(self._entity_id_set(left_children),
@@ -233,8 +351,31 @@ class SetOpSelector(Selector):
 		return "<%r %s %r>" % (self.left, infix, self.right)
 
 
-SELF = FuncSelector(lambda _, source: [source])
-OWNER = FuncSelector(lambda entities, source: [source.owner] if hasattr(source, "owner") else [])
+def _terms(selector):
+	if isinstance(selector, SetOpSelector):
+		return selector.terms
+	return [(selector, False)]
+
+
+def _card_types(selector):
+	"""
+	Returns the set of card types a union of CardType EnumSelectors (such
+	as CHARACTER) selects, or None for any other selector.
+	"""
+	if isinstance(selector, EnumSelector):
+		if isinstance(selector.tag_enum, CardType):
+			return {selector.tag_enum}
+	elif isinstance(selector, SetOpSelector) and selector.op is operator.or_:
+		left, right = _card_types(selector.left), _card_types(selector.right)
+		if left and right:
+			return left | right
+	return None
+
+
+SELF = FuncSelector(lambda _, source: [source], structural=True)
+OWNER = FuncSelector(
+	lambda entities, source: [source.owner] if hasattr(source, "owner") else [], structural=True
+)
 
 
 def LazyValueSelector(value):
@@ -242,7 +383,7 @@ def LazyValueSelector(value):
 
 
 def ID(id):
-	return FilterSelector(lambda entity, source: getattr(entity, "id", None) == id)
+	return FilterSelector(lambda entity, source: getattr(entity, "id", None) == id, structural=True)
 
 TARGET = FuncSelector(lambda entities, source: [source.target])
 
@@ -258,6 +399,10 @@ class BoardPositionSelector(Selector):
 		self.child = child
 		self.direction = direction
 
+	@property
+	def structural(self):
+		return self.child.structural
+
 	def eval(self, entities, source):
 		result = []
 		for e in self.child.eval(entities, source):
@@ -348,7 +493,15 @@ CONTROLLED_BY_OWNER_OPPONENT = CONTROLLER == Opponent(OWNER)
 
 
 # Enum tests
-GameTag.test = lambda self, entity, *args: entity is not None and bool(entity.tags.get(self))
+def _test_tag(self, entity, *args):
+	if entity is None:
+		return False
+	# Read the mapped attribute directly: it skips creating the entity's
+	# tag manager, and keywords are answered from the entity's bitset.
+	attr = entity.Manager.map.get(self)
+	return bool(attr and getattr(entity, attr, 0))
+
+GameTag.test = _test_tag
 CardType.test = lambda self, entity, *args: entity is not None and self == entity.type
 Race.test = lambda self, entity, *args: entity is not None and self == getattr(entity, "race", Race.INVALID)
 Rarity.test = lambda self, entity, *args: entity is not None and self == getattr(entity, "rarity", Rarity.INVALID)
@@ -1,28 +1,53 @@
 import uuid
+from itertools import chain
 from hearthstone.enums import CardType
 from . import logging
 
 
 class BaseEntity(object):
+	# Attributes every entity sets are slots. Subclasses declare their own
+	# (or an empty tuple); __dict__ holds the attributes set from tags
+	# and by card scripts.
+	__slots__ = (
+		"__dict__", "_manager", "_uuid", "_events", "_derived", "_keywords", "buffs", "slots",
+		"play_counter", "entity_id",
+	)
 	base_events = []
 	logger = logging.log
 	ignore_scripts = False
 	type = CardType.INVALID
 
 	def __init__(self):
-		self.manager = self.Manager(self)
 		self.play_counter = 0
-		self.tags = self.manager
-		self.uuid = uuid.uuid4()
 
 		if self.data:
-			self._events = self.data.scripts.events[:]
+			# Shared with the card definition until modified (see _mutable_events())
+			self._events = self.data.scripts.events
 		else:
 			self._events = []
 
 	def __int__(self):
 		return self.entity_id
 
+	@property
+	def manager(self):
+		# Created on first use: most cards never need theirs
+		try:
+			return self._manager
+		except AttributeError:
+			self._manager = self.Manager(self)
+			return self._manager
+
+	tags = manager
+
+	@property
+	def uuid(self):
+		try:
+			return self._uuid
+		except AttributeError:
+			self._uuid = uuid.uuid4()
+			return self._uuid
+
 	@property
 	def is_card(self):
 		"""
@@ -34,11 +59,28 @@ class BaseEntity(object):
 	def events(self):
 		return self.base_events + self._events
 
+	@property
+	def all_events(self):
+		"""
+		Every event listener the entity may have until it changes zone or
+		its own listeners change: events, plus those which depend on other
+		state (see ListenerRegistry).
+		"""
+		return self.events
+
 	@property
 	def update_scripts(self):
 		if self.data and not self.ignore_scripts:
 			yield from self.data.scripts.update
 
+	def _mutable_events(self):
+		"""
+		Return the entity's own list of events, to modify it.
+		"""
+		if self.data and self._events is self.data.scripts.events:
+			self._events = self._events[:]
+		return self._events
+
 	def log(self, message, *args):
 		self.logger.info(message, *args)
 
@@ -70,7 +112,8 @@ class BaseEntity(object):
 				actions.append(action)
 		source.game.trigger(self, actions, args)
 		if event.once:
-			self._events.remove(event)
+			self._mutable_events().remove(event)
+			self.game.listeners.register(self)
 
 		return actions
 
@@ -83,22 +126,149 @@ class BaseEntity(object):
 			return 0
 		return amount
 
+	def _invalidate_derived(self):
+		"""
+		Called whenever a value _getattr() or a boolean_property depends on
+		changes.
+		"""
+		pass
+
+	def _may_have_keyword(self, bit):
+		"""
+		False if the boolean_property of bit \a bit is known to be falsy.
+		"""
+		return True
+
 
 class BuffableEntity(BaseEntity):
+	__slots__ = ()
+
+	# Debug switch: check every cached derived value against a full computation
+	verify_derived_cache = False
+
 	def __init__(self):
+		# attr -> [buff segments, slot segments] ledger (see _segments())
+		self._derived = {}
+		# (flags, dynamic) keyword bitsets, None until computed
+		self._keywords = None
 		super().__init__()
-		self.buffs = []
-		self.slots = []
+		# Empty tuples until the first buff or slot is added
+		self.buffs = ()
+		self.slots = ()
 
-	def _getattr(self, attr, i):
+	def _invalidate_derived(self):
+		self._derived.clear()
+		self._keywords = None
+		self._modifiers_changed()
+
+	def _modifiers_changed(self):
+		"""
+		Called whenever a buff, slot or own value the derived values of the
+		entity depend on changes.
+		"""
+		pass
+
+	def add_buff(self, buff):
+		if self.buffs:
+			self.buffs.append(buff)
+		else:
+			self.buffs = [buff]
+		self._modifier_added(buff, 0)
+
+	def remove_buff(self, buff):
+		# Not list.remove(): enchantments compare equal by card ID
+		del self.buffs[_index(self.buffs, buff)]
+		self._modifier_removed(0)
+
+	def add_slot(self, slot):
+		if self.slots:
+			self.slots.append(slot)
+		else:
+			self.slots = [slot]
+		self._modifier_added(slot, 1)
+
+	def remove_slot(self, slot):
+		del self.slots[_index(self.slots, slot)]
+		self._modifier_removed(1)
+
+	def _modifier_added(self, modifier, part):
+		"""
+		Appends \a modifier to the cached ledgers and keyword bitsets.
+		\a part is 0 for a buff, 1 for a slot.
+		"""
+		for attr, ledger in self._derived.items():
+			if ledger[part] is not None:
+				_push_modifier(ledger[part], modifier, attr)
+		if self._keywords is not None:
+			flags, dynamic = _modifier_keywords(modifier)
+			self._keywords = (self._keywords[0] | flags, self._keywords[1] | dynamic)
+		self._modifiers_changed()
+
+	def _modifier_removed(self, part):
+		# Removals can happen anywhere in the chain: rebuild that part
+		for ledger in self._derived.values():
+			ledger[part] = None
+		self._keywords = None
+		self._modifiers_changed()
+
+	def _apply_modifiers(self, attr, i):
 		i += getattr(self, "_" + attr, 0)
 		for buff in self.buffs:
 			i = buff._getattr(attr, i)
 		for slot in self.slots:
 			i = slot._getattr(attr, i)
+		return i
+
+	def _getattr(self, attr, i):
+		try:
+			ledger = self._derived[attr]
+		except KeyError:
+			ledger = self._derived[attr] = [None, None]
+		if ledger[0] is None:
+			ledger[0] = _segments(self.buffs, attr)
+		if ledger[1] is None:
+			ledger[1] = _segments(self.slots, attr)
+
+		ret = i + getattr(self, "_" + attr, 0)
+		for segments in ledger:
+			for delta, modifier in segments:
+				ret += delta
+				if modifier is not None:
+					ret = modifier._getattr(attr, ret)
+
+		if self.verify_derived_cache:
+			expected = self._apply_modifiers(attr, i)
+			assert ret == expected, "Stale %s on %r: %r != %r" % (attr, self, ret, expected)
+
 		if self.ignore_scripts:
-			return i
-		return getattr(self.data.scripts, attr, lambda s, x: x)(self, i)
+			return ret
+		return getattr(self.data.scripts, attr, lambda s, x: x)(self, ret)
+
+	def _keyword_bitsets(self):
+		"""
+		Returns (flags, dynamic): \a flags has the bit of every keyword
+		(boolean_property) which is currently truthy, \a dynamic the bit of
+		every keyword a card script computes, which must be read in full.
+		"""
+		ret = self._keywords
+		if ret is None:
+			flags = dynamic = 0
+			scripts = self.data.scripts if self.data else None
+			for attr, bit in KEYWORD_BITS.items():
+				if hasattr(scripts, attr):
+					dynamic |= bit
+				elif getattr(self, "_" + attr, False):
+					flags |= bit
+			for modifier in chain(self.buffs, self.slots):
+				modifier_flags, modifier_dynamic = _modifier_keywords(modifier)
+				flags |= modifier_flags
+				dynamic |= modifier_dynamic
+			ret = self._keywords = (flags, dynamic)
+		return ret
+
+	def _may_have_keyword(self, bit):
+		flags, dynamic = self._keyword_bitsets()
+		return (flags | dynamic) & bit
 
 	def clear_buffs(self):
 		if self.buffs:
@@ -108,7 +278,56 @@ class BuffableEntity(BaseEntity):
 
 
 class Entity(BuffableEntity):
-	pass
+	__slots__ = ()
+
+
+def _index(modifiers, modifier):
+	"""
+	Returns the position of \a modifier in \a modifiers, by identity
+	"""
+	for i, m in enumerate(modifiers):
+		if m is modifier:
+			return i
+	raise ValueError("%r is not in list" % (modifier))
+
+
+def _push_modifier(segments, modifier, attr):
+	value = modifier._static_delta(attr)
+	if value is None:
+		# Dynamic modifiers close the segment: they see the value so far
+		segments[-1][1] = modifier
+		segments.append([0, None])
+	else:
+		segments[-1][0] += value
+
+
+def _segments(modifiers, attr):
+	"""
+	Returns the ledger of \a modifiers to \a attr: a list of [delta, modifier]
+	segments, where delta sums a run of static modifiers (which commute) and
+	modifier is the dynamic modifier (a script or a callable aura value)
+	applied after them, None for the last segment. Reads only call the
+	dynamic modifiers, however many static buffs stack up.
+	"""
+	segments = [[0, None]]
+	for modifier in modifiers:
+		_push_modifier(segments, modifier, attr)
+	return segments
+
+
+def _modifier_keywords(modifier):
+	"""
+	Returns the (flags, dynamic) keyword bitsets \a modifier contributes
+	"""
+	flags = dynamic = 0
+	data = getattr(modifier, "data", None)
+	scripts = data.scripts if data is not None else None
+	for attr, bit in KEYWORD_BITS.items():
+		if hasattr(scripts, attr):
+			dynamic |= bit
+		elif getattr(modifier, attr, False):
+			flags |= bit
+	return flags, dynamic
 
 
 def slot_property(attr, f=any):
@@ -118,9 +337,14 @@ def slot_property(attr, f=any):
 	return func
 
 
+# Attribute -> bit of every boolean_property, in BuffableEntity keyword bitsets
+KEYWORD_BITS = {}
+
+
 def boolean_property(attr):
-	@property
-	def func(self):
+	bit = KEYWORD_BITS.setdefault(attr, 1 << len(KEYWORD_BITS))
+
+	def _get(self):
 		return (
 			getattr(self, "_" + attr, False) or
 			any(getattr(buff, attr, False) for buff in self.buffs) or
@@ -128,9 +352,18 @@ def boolean_property(attr):
 			getattr(self.data.scripts, attr, lambda s, x: x)(self, False)
 		)
 
+	@property
+	def func(self):
+		if not self._may_have_keyword(bit):
+			if self.verify_derived_cache:
+				assert not _get(self), "Stale %s on %r" % (attr, self)
+			return False
+		return _get(self)
+
 	@func.setter
 	def func(self, value):
 		setattr(self, "_" + attr, value)
+		self._invalidate_derived()
 
 	return func
 
@@ -144,5 +377,6 @@ def int_property(attr):
 	@func.setter
 	def func(self, value):
 		setattr(self, "_" + attr, value)
+		self._invalidate_derived()
 
 	return func
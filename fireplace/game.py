@@ -1,25 +1,58 @@
 import random
-import time
-from calendar import timegm
+from collections import OrderedDict
+from functools import wraps
 from itertools import chain
 from hearthstone.enums import CardType, PlayState, PowSubType, State, Step, Zone
 from .actions import Attack, BeginTurn, Death, EndTurn, EventListener, Play
+from .aura import ActiveAuraBuffs
 from .card import THE_COIN
+from .clock import VirtualClock
 from .entity import Entity
+from .listeners import ListenerRegistry
 from .managers import GameManager
 from .utils import CardList
 from .exceptions import GameOver
 
 
+def zone_view(func):
+	"""
+	A game-wide CardList of the entities \a func returns, built once and
+	shared until an entity changes zone (see zone_version).
+	Views must not be modified.
+	"""
+	name = func.__name__
+
+	@wraps(func)
+	def view(self):
+		if self._views_version != self.zone_version:
+			self._views.clear()
+			self._views_version = self.zone_version
+		try:
+			return self._views[name]
+		except KeyError:
+			ret = self._views[name] = CardList(func(self))
+			return ret
+
+	return property(view)
+
+
 class BaseGame(Entity):
 	type = CardType.GAME
 	MAX_MINIONS_ON_FIELD = 7
 	Manager = GameManager
+	# Check the death candidates against a scan of every live entity
+	verify_deaths = False
 
-	def __init__(self, players):
+	def __init__(self, players, clock=None):
 		self.data = None
 		self.players = players
+		# Turn start times and timeouts are read from this clock
+		self.clock = clock if clock is not None else VirtualClock()
 		super().__init__()
+		# entity_id -> entity, in play_counter order
+		self.entity_by_id = OrderedDict()
+		# Not lazy: the game manager numbers the entities, starting with the game
+		self._manager = self.Manager(self)
 		for player in players:
 			player.game = self
 		self.state = State.INVALID
@@ -28,55 +61,83 @@ class BaseGame(Entity):
 		self.turn = 0
 		self.current_player = None
 		self.tick = 0
-		self.active_aura_buffs = CardList()
+		self.active_aura_buffs = ActiveAuraBuffs()
+		self.listeners = ListenerRegistry()
+		# Bumped whenever an entity changes zone or a deck is shuffled
+		self.zone_version = 0
+		# Cached zone views, for _views_version
+		self._views = {}
+		self._views_version = 0
+		# (id(Refresh), source entity_id) -> (zone_version, targets)
+		self.aura_targets = {}
+		# entity_id -> live entity to check in the next process_deaths()
+		self.death_candidates = {}
+		# entity_id -> live entity with scripted health, checked every time
+		self.death_watch = {}
 		self._action_stack = 0
 
 	def __repr__(self):
 		return "%s(players=%r)" % (self.__class__.__name__, self.players)
 
 	def __iter__(self):
-		return chain(self.entities, self.hands, self.decks, self.graveyard, self.discarded)
+		return iter(self.all_entities)
 
 	@property
 	def game(self):
 		return self
 
-	@property
+	@zone_view
+	def all_entities(self):
+		return chain(self.entities, self.hands, self.decks, self.graveyard, self.discarded)
+
+	@zone_view
 	def board(self):
-		return CardList(chain(self.players[0].field, self.players[1].field))
+		return chain(self.players[0].field, self.players[1].field)
 
-	@property
+	@zone_view
 	def decks(self):
-		return CardList(chain(self.players[0].deck, self.players[1].deck))
+		return chain(self.players[0].deck, self.players[1].deck)
 
-	@property
+	@zone_view
 	def discarded(self):
-		return CardList(chain(self.players[0].discarded, self.players[1].discarded))
+		return chain(self.players[0].discarded, self.players[1].discarded)
 
-	@property
+	@zone_view
 	def hands(self):
-		return CardList(chain(self.players[0].hand, self.players[1].hand))
+		return chain(self.players[0].hand, self.players[1].hand)
 
-	@property
+	@zone_view
 	def characters(self):
-		return CardList(chain(self.players[0].characters, self.players[1].characters))
+		return chain(self.players[0].characters, self.players[1].characters)
 
-	@property
+	@zone_view
 	def graveyard(self):
-		return CardList(chain(self.players[0].graveyard, self.players[1].graveyard))
+		return chain(self.players[0].graveyard, self.players[1].graveyard)
 
-	@property
+	@zone_view
 	def entities(self):
-		return CardList(chain([self], self.players[0].entities, self.players[1].entities))
+		return chain([self], self.players[0].entities, self.players[1].entities)
 
-	@property
+	@zone_view
 	def live_entities(self):
-		return CardList(chain(self.players[0].live_entities, self.players[1].live_entities))
+		return chain(self.players[0].live_entities, self.players[1].live_entities)
 
 	@property
 	def minions_killed_this_turn(self):
 		return self.players[0].minions_killed_this_turn + self.players[1].minions_killed_this_turn
 
+	def board_arrays(self, out=None, player=None):
+		"""
+		Export the heroes, boards and hands of the game, as seen by \a player,
+		into fixed-shape numpy arrays (see boardstate.BoardArrays).
+		Pass the BoardArrays of a previous call as \a out to fill it in place
+		instead of allocating new arrays. Requires numpy.
+		"""
+		if out is None:
+			from .boardstate import BoardArrays
+			out = BoardArrays()
+		return out.fill(self, player)
+
 	def action_start(self, type, source, index, target):
 		self.manager.action_start(type, source, index, target)
 		if type != PowSubType.PLAY:
@@ -121,10 +182,36 @@ class BaseGame(Entity):
 
 	def process_deaths(self):
 		type = PowSubType.DEATHS
+		if not self.death_candidates and not self.death_watch and not self.verify_deaths:
+			return
+
+		# Only the live entities whose health or destruction flag changed
+		# (and those with scripted health) can have died
+		candidates = self.death_candidates
+		candidates.update(self.death_watch)
+		self.death_candidates = {}
 		cards = []
+		# In board order, the order deaths (and deathrattles) resolve in
 		for card in self.live_entities:
+			# Not numbered yet: queued once it is (see BaseCard._numbered())
+			entity_id = getattr(card, "entity_id", None)
+			if entity_id is None or candidates.pop(entity_id, None) is None:
+				continue
 			if card.to_be_destroyed:
 				cards.append(card)
+			if card.dynamic_health:
+				self.death_watch[card.entity_id] = card
+			else:
+				self.death_watch.pop(card.entity_id, None)
+		# Candidates which are no longer live
+		for entity_id in candidates:
+			self.death_watch.pop(entity_id, None)
+
+		if self.verify_deaths:
+			expected = [card for card in self.live_entities if card.to_be_destroyed]
+			assert list(map(id, cards)) == list(map(id, expected)), (
+				"Missed deaths: %r != %r" % (cards, expected)
+			)
 
 		actions = []
 		if cards:
@@ -201,7 +288,8 @@ class BaseGame(Entity):
 					listener = source.controller
 				else:
 					listener = source
-				listener._events.append(action)
+				listener._mutable_events().append(action)
+				self.listeners.register(listener)
 			else:
 				ret.append(action.trigger(source))
 		return ret
@@ -229,11 +317,8 @@ class BaseGame(Entity):
 		for entity, action in refresh_queue:
 			action.trigger(entity)
 
-		buffs_to_destroy = []
-		for buff in self.active_aura_buffs:
-			if buff.tick < self.tick:
-				buffs_to_destroy.append(buff)
-		for buff in buffs_to_destroy:
+		# Buffs no aura refreshed this tick
+		for buff in self.active_aura_buffs.expired(self.tick):
 			buff.remove()
 
 		self.tick += 1
@@ -245,9 +330,11 @@ class BaseGame(Entity):
 		self.zone = Zone.PLAY
 		self.players[0].opponent = self.players[1]
 		self.players[1].opponent = self.players[0]
+		self.listeners.register(self)
 		for player in self.players:
 			player.zone = Zone.PLAY
 			self.manager.new_entity(player)
+			self.listeners.register(player)
 
 		first, second = self.pick_first_player()
 		self.player1 = first
@@ -298,7 +385,7 @@ class BaseGame(Entity):
 		for p in self.players:
 			p.cards_drawn_this_turn = 0
 
-		player.turn_start = timegm(time.gmtime())
+		player.turn_start = self.clock.now()
 		player.cards_played_this_turn = 0
 		player.minions_played_this_turn = 0
 		player.minions_killed_this_turn = 0
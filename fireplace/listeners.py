@@ -0,0 +1,91 @@
+"""
+Event listener registry
+"""
+from hearthstone.enums import Zone
+
+
+# The zones of the entities broadcasts go through (game.entities and game.hands)
+LISTENING_ZONES = (Zone.PLAY, Zone.SECRET, Zone.HAND)
+
+
+class ListenerRegistry:
+	"""
+	Keeps, for each (trigger action class, EventListener.ON/AFTER) pair,
+	the set of entities which may listen for it, so that broadcasts can
+	skip the entities which don't.
+	Entities are registered again whenever the listeners they may have
+	change: zone changes, one-time listeners added or fired, silences.
+	Registration is conservative (see BaseEntity.all_events); listeners
+	are still matched exactly against entity.events.
+	Keyed by entity_id; cards are registered once they have one.
+	"""
+	# Check every skipped entity against its actual listeners
+	verify = False
+
+	def __init__(self):
+		# (trigger class, at) -> set of entity_id
+		self.listeners = {}
+		# entity_id -> set of (trigger class, at) it is registered for
+		self.entity_keys = {}
+		# (action class, at) -> list of the listener sets of its subclasses
+		self._candidates = {}
+
+	def __repr__(self):
+		return "<%s (%i entities)>" % (self.__class__.__name__, len(self.entity_keys))
+
+	def register(self, entity):
+		"""
+		(Re)register the listeners \a entity may have
+		"""
+		key = getattr(entity, "entity_id", None)
+		if key is None:
+			return
+		if entity.zone in LISTENING_ZONES:
+			keys = set((type(event.trigger), event.at) for event in entity.all_events)
+		else:
+			keys = set()
+		old_keys = self.entity_keys.get(key, set())
+		for k in old_keys - keys:
+			self.listeners[k].discard(key)
+		for k in keys - old_keys:
+			if k not in self.listeners:
+				self.listeners[k] = set()
+				self._candidates.clear()
+			self.listeners[k].add(key)
+		self.entity_keys[key] = keys
+
+	def _listener_sets(self, cls, at):
+		try:
+			return self._candidates[cls, at]
+		except KeyError:
+			# Listeners trigger on instances of their trigger's class
+			ret = self._candidates[cls, at] = [
+				entities for (trigger, trigger_at), entities in self.listeners.items()
+				if trigger_at == at and issubclass(trigger, cls)
+			]
+			return ret
+
+	def has_listeners(self, cls, at):
+		"""
+		Returns whether any entity may listen for actions of class \a cls
+		"""
+		return any(self._listener_sets(cls, at))
+
+	def may_listen(self, entity, cls, at):
+		"""
+		Returns whether \a entity may listen for actions of class \a cls
+		"""
+		key = getattr(entity, "entity_id", None)
+		if key is None:
+			# Not registered yet (a hero summoning its hero power)
+			return True
+		for entities in self._listener_sets(cls, at):
+			if key in entities:
+				return True
+
+		if self.verify:
+			for event in entity.events:
+				assert event.at != at or not isinstance(event.trigger, cls), (
+					"%r listens for %r with %r but is not registered" % (entity, cls, event)
+				)
+		return False
@@ -1,8 +1,25 @@
+from operator import attrgetter
 from hearthstone.enums import GameTag
 from . import enums
 
 
-class Manager(object):
+class ManagerType(type):
+	"""
+	Builds the accessor table of a Manager class from its map, when the
+	class is defined: a tuple of (tag, getter) pairs for the mapped tags,
+	skipping the tags mapped to None.
+	"""
+	def __init__(cls, name, bases, attrs):
+		super().__init__(name, bases, attrs)
+		map = getattr(cls, "map", {})
+		cls.accessors = tuple(
+			(tag, attrgetter(attr)) for tag, attr in map.items() if attr is not None
+		)
+
+
+class Manager(object, metaclass=ManagerType):
+	__slots__ = ("obj", "observers")
+
 	def __init__(self, obj):
 		self.obj = obj
 		self.observers = []
@@ -16,28 +33,56 @@ class Manager(object):
 		setattr(self.obj, self.map[tag], value)
 
 	def __iter__(self):
-		for k in self.map:
-			if self.map[k]:
-				yield k
+		for tag, getter in self.accessors:
+			yield tag
 
 	def get(self, k, default=None):
 		return self[k] if k in self.map else default
 
 	def items(self):
-		for k, v in self.map.items():
-			if v is not None:
-				yield k, self[k]
+		obj = self.obj
+		for tag, getter in self.accessors:
+			try:
+				yield tag, getter(obj)
+			except AttributeError:
+				yield tag, 0
+
+	def snapshot(self):
+		"""
+		Returns a dict of tag -> int of the truthy, non-string tag values
+		of the object, as serialized in game states.
+		"""
+		ret = {}
+		obj = self.obj
+		for tag, getter in self.accessors:
+			try:
+				value = getter(obj)
+			except AttributeError:
+				continue
+			if value and not isinstance(value, str):
+				ret[tag] = int(value)
+		return ret
 
 	def register(self, observer):
 		self.observers.append(observer)
 
 	def update(self, tags):
+		self.update_object(self.obj, tags)
+
+	@classmethod
+	def update_object(cls, obj, tags):
+		"""
+		Set the attributes of \a obj mapped to \a tags, without going
+		through a Manager instance.
+		"""
 		for k, v in tags.items():
-			if self.map.get(k) is not None:
-				self[k] = v
+			attr = cls.map.get(k)
+			if attr is not None:
+				setattr(obj, attr, v)
 
 
 class GameManager(Manager):
+	__slots__ = ("counter", )
 	map = {
 		GameTag.CARDTYPE: "type",
 		GameTag.NEXT_STEP: "next_step",
@@ -54,6 +99,7 @@ class GameManager(Manager):
 		super().__init__(obj)
 		self.counter = 1
 		obj.entity_id = self.counter
+		obj.entity_by_id[self.counter] = obj
 
 	def action_start(self, type, source, index, target):
 		for observer in self.observers:
@@ -66,6 +112,7 @@ class GameManager(Manager):
 	def new_entity(self, entity):
 		self.counter += 1
 		entity.entity_id = self.counter
+		self.obj.entity_by_id[self.counter] = entity
 		for observer in self.observers:
 			observer.new_entity(entity)
 
@@ -81,6 +128,7 @@ class GameManager(Manager):
 
 
 class PlayerManager(Manager):
+	__slots__ = ()
 	map = {
 		GameTag.CANT_DRAW: "cant_draw",
 		GameTag.CARDTYPE: "type",
@@ -221,4 +269,5 @@ CARD_ATTRIBUTE_MAP = {
 
 
 class CardManager(Manager):
+	__slots__ = ()
 	map = CARD_ATTRIBUTE_MAP
@@ -11,6 +11,12 @@ from .managers import PlayerManager
 from .utils import CardList
 
 
+# Card types Player.zone_entities() can list in the PLAY zone
+INDEXED_PLAY_TYPES = frozenset((
+	CardType.MINION, CardType.HERO, CardType.HERO_POWER, CardType.WEAPON, CardType.PLAYER,
+))
+
+
 class Player(Entity, TargetableByAuras):
 	Manager = PlayerManager
 	cant_overload = slot_property("cant_overload")
@@ -52,6 +58,7 @@ class Player(Entity, TargetableByAuras):
 		self.playstate = PlayState.INVALID
 		self.temp_mana = 0
 		self.timeout = 75
+		self.turn_start = 0
 		self.times_hero_power_used_this_game = 0
 		self.used_mana = 0
 		self.minions_killed_this_turn = 0
@@ -103,6 +110,17 @@ class Player(Entity, TargetableByAuras):
 			return self._start_hand_size + 1
 		return self._start_hand_size
 
+	@property
+	def time_left(self):
+		"""
+		Seconds left in the player's turn, on the game clock
+		"""
+		return self.turn_start + self.timeout - self.game.clock.now()
+
+	@property
+	def timed_out(self):
+		return self.current_player and self.time_left <= 0
+
 	@property
 	def characters(self):
 		return CardList(chain([self.hero] if self.hero else [], self.field))
@@ -117,6 +135,36 @@ class Player(Entity, TargetableByAuras):
 			yield from self.hero.entities
 		yield self
 
+	def zone_entities(self, zone, types):
+		"""
+		Returns the player's entities which may be in \a zone and of one of
+		the card types \a types (any type if empty), in the order the game
+		iterates them, or None if they can't be listed without a scan.
+		The result can contain other entities: callers still test each one.
+		"""
+		if zone == Zone.HAND:
+			return self.hand
+		elif zone == Zone.DECK:
+			return self.deck
+		elif zone == Zone.SECRET:
+			return self.secrets
+		elif zone == Zone.PLAY and types and types <= INDEXED_PLAY_TYPES:
+			# Same order as self.entities
+			ret = []
+			if CardType.MINION in types:
+				ret += self.field
+			if self.hero:
+				if CardType.HERO in types:
+					ret.append(self.hero)
+				if CardType.HERO_POWER in types and self.hero.power:
+					ret.append(self.hero.power)
+				if CardType.WEAPON in types and self.weapon:
+					ret.append(self.weapon)
+			if CardType.PLAYER in types:
+				ret.append(self)
+			return ret
+		return None
+
 	@property
 	def live_entities(self):
 		yield from self.field
@@ -145,6 +193,7 @@ class Player(Entity, TargetableByAuras):
 		if source is not None:
 			card.creator = source
 		self.game.manager.new_entity(card)
+		card._numbered()
 		return card
 
 	def prepare_for_game(self):
@@ -194,6 +243,7 @@ class Player(Entity, TargetableByAuras):
 	def shuffle_deck(self):
 		self.log("%r shuffles their deck", self)
 		random.shuffle(self.deck)
+		self.game.zone_version += 1
 
 	def draw(self, count=1):
 		if self.cant_draw:
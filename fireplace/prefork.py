@@ -0,0 +1,100 @@
+"""
+Pre-forking ("zygote") launcher.
+
+The parent process imports every card set and initializes the card
+database once, then forks workers which share those pages copy-on-write
+instead of each building their own copy.
+"""
+import gc
+import os
+import random
+import signal
+from . import cards
+from .logging import log
+from .utils import script_registry
+
+
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)
+
+
+def prepare():
+	"""
+	Import every card set and fully merge the card database in the
+	current process, so that forked workers never have to.
+	"""
+	script_registry.load()
+	if not cards.db.initialized:
+		cards.db.initialize()
+	cards.db.merge_all()
+
+	gc.collect()
+	if hasattr(gc, "freeze"):
+		# Move the shared objects out of the collector's reach, so that
+		# collections in the workers don't write to (and copy) their pages.
+		gc.freeze()
+
+
+def _run_worker(index, target, args, kwargs):
+	for signum in FORWARDED_SIGNALS:
+		signal.signal(signum, signal.SIG_DFL)
+	# Don't let every worker play the same random games
+	random.seed()
+
+	status = 1
+	try:
+		target(*args, **kwargs)
+		status = 0
+	except Exception:
+		log.exception("Worker %i failed", index)
+	finally:
+		os._exit(status)
+
+
+def _exit_code(status):
+	if os.WIFSIGNALED(status):
+		return -os.WTERMSIG(status)
+	return os.WEXITSTATUS(status)
+
+
+def prefork(target, workers, *args, **kwargs):
+	"""
+	Prepare the card database, then call \a target(*args, **kwargs) in
+	\a workers forked processes.
+	Termination signals received by the parent are forwarded to the workers.
+	Blocks until every worker exits and returns the list of their exit
+	codes (negative for a worker killed by a signal).
+	"""
+	prepare()
+
+	pids = {}
+	for i in range(workers):
+		pid = os.fork()
+		if pid == 0:
+			_run_worker(i, target, args, kwargs)
+		pids[pid] = i
+	log.info("Forked %i workers", workers)
+
+	def forward(signum, frame):
+		for pid in list(pids):
+			try:
+				os.kill(pid, signum)
+			except ProcessLookupError:
+				pass
+
+	handlers = {signum: signal.signal(signum, forward) for signum in FORWARDED_SIGNALS}
+	ret = [None] * workers
+	try:
+		while pids:
+			try:
+				pid, status = os.waitpid(-1, 0)
+			except ChildProcessError:
+				break
+			if pid in pids:
+				i = pids.pop(pid)
+				ret[i] = _exit_code(status)
+				log.info("Worker %i exited with code %i", i, ret[i])
+	finally:
+		for signum, handler in handlers.items():
+			signal.signal(signum, handler)
+
+	return ret
@@ -9,6 +9,7 @@ HEAVILY_ARMORED = [Predamage(SELF, lambda i: i > 1).on(Predamage(SELF, 1))]
 
 
 class WeaponRules:
+	__slots__ = ()
 	base_events = [
 		Attack(FRIENDLY_HERO).after(Hit(SELF, 1))
 	]
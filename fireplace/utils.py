@@ -1,14 +1,29 @@
 import os.path
+import re
+from contextlib import contextmanager
 from importlib import import_module
+from inspect import isclass
 from pkgutil import iter_modules
 from xml.etree import ElementTree
 from hearthstone.enums import CardType
+from .logging import log
 
 
 # Autogenerate the list of cardset modules
 _cards_module = os.path.join(os.path.dirname(__file__), "cards")
 CARD_SETS = [cs for _, cs, ispkg in iter_modules([_cards_module]) if ispkg]
 
+# Top-level class definitions and assignments in card set sources
+_definition_re = re.compile(r"^(?:class\s+(\w+)|(\w+)\s*=)", re.MULTILINE)
+
+
+@contextmanager
+def untimed_phase(name, **info):
+	"""
+	Stands in for the phase() of a bench.PhaseTimer when nothing is timed
+	"""
+	yield
+
 
 class CardList(list):
 	def __contains__(self, x):
@@ -60,57 +75,142 @@ class CardList(list):
 def random_draft(hero, exclude=[]):
 	"""
 	Return a deck of 30 random cards from the \a hero's collection
+	See fireplace.draft for batch drafting.
 	"""
-	import random
-	from . import cards
-	from .deck import Deck
-	from hearthstone.enums import CardType, Rarity
+	from . import draft
 
-	deck = []
-	collection = []
-	hero = cards.db[hero]
+	return draft.random_draft(hero, exclude)
 
-	for card in cards.db.keys():
-		if card in exclude:
-			continue
-		cls = cards.db[card]
-		if not cls.collectible:
-			continue
-		if cls.type == CardType.HERO:
-			# Heroes are collectible...
-			continue
-		if cls.card_class and cls.card_class != hero.card_class:
-			continue
-		collection.append(cls)
 
-	while len(deck) < Deck.MAX_CARDS:
-		card = random.choice(collection)
-		if card.rarity == Rarity.LEGENDARY and card.id in deck:
-			continue
-		elif deck.count(card.id) < Deck.MAX_UNIQUE_CARDS:
-			deck.append(card.id)
+class ScriptRegistry(dict):
+	"""
+	A mapping of card ID -> script definition.
+	Definitions are registered as their card set package is imported.
+	When several card sets define the same ID, the first card set (in
+	CARD_SETS order) wins and the others are recorded in \a duplicates.
+	"""
+	def __init__(self):
+		self.cardsets = {}
+		self.duplicates = {}
+		self.loaded = set()
+		self.complete = False
+		self._index = None
+
+	@property
+	def index(self):
+		"""
+		A mapping of card ID -> card set package defining it, built
+		without importing anything (see build_script_index()).
+		"""
+		if self._index is None:
+			self._index = build_script_index()
+		return self._index
+
+	def load_cardset(self, cardset):
+		"""
+		Import the card set \a cardset and register its definitions
+		"""
+		if cardset in self.loaded:
+			return
+		self.loaded.add(cardset)
+		module = import_module("fireplace.cards.%s" % (cardset))
+		# Every card set star-imports the card helpers, skip those.
+		helpers = import_module("fireplace.cards.utils")
+		for id, carddef in vars(module).items():
+			if not isclass(carddef) or id.startswith("_"):
+				continue
+			if getattr(helpers, id, None) is carddef:
+				continue
+			self.register(id, carddef, cardset)
+
+	def load(self, timer=None):
+		"""
+		Import every card set and register their definitions
+		If given, \a timer (a bench.PhaseTimer) times each import.
+		"""
+		if self.complete:
+			return
+		phase = timer.phase if timer is not None else untimed_phase
+		for cardset in CARD_SETS:
+			with phase("import cardset", cardset=cardset):
+				self.load_cardset(cardset)
+		self.complete = True
+
+	def lookup(self, id):
+		"""
+		Return the script definition for card \a id, importing only the
+		card set package which defines it.
+		"""
+		if not self.complete:
+			cardset = self.index.get(id)
+			if cardset is not None:
+				self.load_cardset(cardset)
+		return self.get(id)
+
+	def register(self, id, carddef, cardset):
+		if id in self:
+			if self[id] is carddef:
+				return
+			# Card sets may be imported out of order by lookup(), the first
+			# card set in CARD_SETS order must still win.
+			winner, loser = self.cardsets[id], cardset
+			if _cardset_order(cardset) < _cardset_order(winner):
+				winner, loser = loser, winner
+				self[id] = carddef
+				self.cardsets[id] = cardset
+			log.warning("%s is defined in both %s and %s, using the former", id, winner, loser)
+			self.duplicates.setdefault(id, []).append(loser)
+			return
+		self[id] = carddef
+		self.cardsets[id] = cardset
+
+
+def _cardset_order(cardset):
+	if cardset in CARD_SETS:
+		return CARD_SETS.index(cardset)
+	return len(CARD_SETS)
+
+
+def build_script_index(cardsets=CARD_SETS):
+	"""
+	Scan the sources of the card set packages \a cardsets for top-level
+	definitions and return a dict of card ID -> card set package.
+	When several card sets define an ID, the first one wins.
+	Nothing is imported, so this is much cheaper than importing the sets.
+	"""
+	ret = {}
+	for cardset in cardsets:
+		for dirpath, dirnames, filenames in os.walk(os.path.join(_cards_module, cardset)):
+			dirnames.sort()
+			for filename in sorted(filenames):
+				if not filename.endswith(".py"):
+					continue
+				with open(os.path.join(dirpath, filename), encoding="utf-8") as f:
+					source = f.read()
+				for match in _definition_re.finditer(source):
+					id = match.group(1) or match.group(2)
+					if not id.startswith("_"):
+						ret.setdefault(id, cardset)
+	return ret
 
-	return deck
+
+script_registry = ScriptRegistry()
 
 
 def get_script_definition(id):
 	"""
 	Find and return the script definition for card \a id
 	"""
-	for cardset in CARD_SETS:
-		module = import_module("fireplace.cards.%s" % (cardset))
-		if hasattr(module, id):
-			return getattr(module, id)
+	return script_registry.lookup(id)
 
 
 def entity_to_xml(entity):
 	e = ElementTree.Element("Entity")
-	for tag, value in entity.tags.items():
-		if value and not isinstance(value, str):
-			te = ElementTree.Element("Tag")
-			te.attrib["enumID"] = str(int(tag))
-			te.attrib["value"] = str(int(value))
-			e.append(te)
+	for tag, value in entity.tags.snapshot().items():
+		te = ElementTree.Element("Tag")
+		te.attrib["enumID"] = str(int(tag))
+		te.attrib["value"] = str(value)
+		e.append(te)
 	return e
 
 
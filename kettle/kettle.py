@@ -10,8 +10,10 @@ from hearthstone.enums import (
 	CardType, ChoiceType, GameTag, OptionType, Step, Zone
 )
 from fireplace import actions, cards
+from fireplace.clock import WallClock
 from fireplace.game import BaseGame as Game
 from fireplace.player import Player
+from fireplace.prefork import prefork
 from fireplace.utils import CardList
 
 
@@ -58,29 +60,8 @@ class KettleManager:
 		self.refresh_full_state()
 
 	def add_to_state(self, entity):
-		state = self.game_state[entity.entity_id] = {}
-		for tag, value in entity.tags.items():
-			if not value:
-				continue
-			if isinstance(value, str):
-				continue
-			state[tag] = int(value)
-
-		# Don't have a way of getting entities by ID in fireplace yet
-		state[GameTag.ENTITY_ID] = entity
-
-	def refresh_tag(self, entity, tag):
-		state = self.game_state[entity.entity_id]
-		value = entity.tags.get(tag, 0)
-		if isinstance(value, str):
-			return
-		if not value:
-			if state.get(tag, 0):
-				self.tag_change(entity, tag, 0)
-				del state[tag]
-		elif int(value) != state.get(tag, 0):
-			self.tag_change(entity, tag, int(value))
-			state[tag] = int(value)
+		state = self.game_state[entity.entity_id] = entity.tags.snapshot()
+		state[GameTag.ENTITY_ID] = entity.entity_id
 
 	def refresh_full_state(self):
 		if self.game.step < Step.BEGIN_MULLIGAN:
@@ -91,11 +72,20 @@ class KettleManager:
 
 	def refresh_state(self, entity_id):
 		assert entity_id in self.game_state
-		entity = self.game_state[entity_id][GameTag.ENTITY_ID]
-		state = self.game_state[entity.entity_id]
+		entity = self.game.entity_by_id[entity_id]
+		state = self.game_state[entity_id]
 
+		snapshot = entity.tags.snapshot()
 		for tag in entity.tags:
-			self.refresh_tag(entity, tag)
+			if tag == GameTag.ENTITY_ID:
+				continue
+			value = snapshot.get(tag, 0)
+			if value != state.get(tag, 0):
+				self.tag_change(entity, tag, value)
+				if value:
+					state[tag] = value
+				else:
+					del state[tag]
 
 	def get_options(self, entity):
 		ret = []
@@ -177,12 +167,19 @@ class KettleManager:
 	def get_entity(self, id):
 		if not id:
 			return None
-		return self.game_state[id][GameTag.ENTITY_ID]
+		return self.game.entity_by_id[id]
 
 	def process_send_option(self, data):
 		DEBUG("Processing send option, data=%r", data)
 		option = self.options[data["Index"]]
-		if option["Type"] == OptionType.END_TURN:
+		if self.game.current_player.timed_out:
+			# Turn timeouts are enforced when the player sends an option
+			WARN(
+				"%s ran out of time: ending their turn instead of %r",
+				self.game.current_player, option
+			)
+			self.game.end_turn()
+		elif option["Type"] == OptionType.END_TURN:
 			self.game.end_turn()
 		elif option["Type"] == OptionType.POWER:
 			entity = option["MainOption"]["ID"]
@@ -314,7 +311,7 @@ class Kettle(socketserver.BaseRequestHandler):
 			players.append(p)
 
 		INFO("Initializing a Kettle game with players=%r", players)
-		game = Game(players=players)
+		game = Game(players=players, clock=WallClock())
 		manager = KettleManager(game)
 		game.manager.register(manager)
 		game.current_player = game.players[0]  # Dumb.
@@ -331,14 +328,21 @@ def main():
 	arguments = ArgumentParser(prog="kettle")
 	arguments.add_argument("hostname", default="127.0.0.1", nargs="?")
 	arguments.add_argument("port", type=int, default=9111, nargs="?")
+	arguments.add_argument(
+		"--workers", type=int, default=0,
+		help="Number of pre-forked worker processes sharing the card database"
+	)
 	args = arguments.parse_args(sys.argv[1:])
 
-	cards.db.initialize()
-
 	INFO("Listening on %s:%i..." % (args.hostname, args.port))
 	socketserver.TCPServer.allow_reuse_address = True
 	kettle = socketserver.TCPServer((args.hostname, args.port), Kettle)
-	kettle.serve_forever()
+	if args.workers:
+		# Every worker accepts connections on the socket bound above
+		prefork(kettle.serve_forever, args.workers)
+	else:
+		cards.db.initialize(lazy=True)
+		kettle.serve_forever()
 
 	return 0
 
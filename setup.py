@@ -22,6 +22,10 @@ setup(
 	name="fireplace",
 	version=fireplace.__version__,
 	packages=find_packages(exclude="tests"),
+	extras_require={
+		# fireplace.cards.table and fireplace.boardstate
+		"numpy": ["numpy"],
+	},
 	tests_require=["pytest"],
 	author=fireplace.__author__,
 	author_email=fireplace.__email__,
@@ -6,6 +6,7 @@ from fireplace.cards.heroes import *
 from fireplace.exceptions import GameOver
 from fireplace.game import Game
 from fireplace.player import Player
+from fireplace.prefork import prefork
 from fireplace.utils import random_draft
 
 
@@ -69,17 +70,27 @@ def test_full_game():
 		print("Game completed normally.")
 
 
+def play_games(numgames):
+	for i in range(numgames):
+		test_full_game()
+
+
 def main():
-	cards.db.initialize()
+	numgames, workers = "1", "0"
 	if len(sys.argv) > 1:
 		numgames = sys.argv[1]
-		if not numgames.isdigit():
-			sys.stderr.write("Usage: %s [NUMGAMES]\n" % (sys.argv[0]))
-			exit(1)
-		for i in range(int(numgames)):
-			test_full_game()
+	if len(sys.argv) > 2:
+		workers = sys.argv[2]
+	if not numgames.isdigit() or not workers.isdigit():
+		sys.stderr.write("Usage: %s [NUMGAMES [WORKERS]]\n" % (sys.argv[0]))
+		exit(1)
+
+	if int(workers):
+		# Each worker plays NUMGAMES games
+		prefork(play_games, int(workers), int(numgames))
 	else:
-		test_full_game()
+		cards.db.initialize()
+		play_games(int(numgames))
 
 
 if __name__ == "__main__":
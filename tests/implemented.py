@@ -4,7 +4,7 @@ import re
 import string
 import sys; sys.path.append("..")
 from fireplace import cards
-from fireplace.utils import get_script_definition
+from fireplace.utils import script_registry
 from hearthstone.enums import CardSet
 
 
@@ -95,8 +95,7 @@ def main():
 		if id in DUMMY_CARDS:
 			implemented = True
 
-		carddef = get_script_definition(id)
-		if carddef:
+		if id in script_registry:
 			implemented = True
 
 		color = GREEN if implemented else RED
@@ -115,6 +114,10 @@ def main():
 
 	print("%i / %i cards implemented (%i%%)" % (impl, total, (impl / total) * 100))
 
+	for id, cardsets in sorted(script_registry.duplicates.items()):
+		cardsets = [script_registry.cardsets[id]] + cardsets
+		print(RED + "Duplicate definition: %s (%s)" % (id, ", ".join(cardsets)) + ENDC)
+
 
 if __name__ == "__main__":
 	main()
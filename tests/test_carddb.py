@@ -1,4 +1,6 @@
-from hearthstone.enums import CardType, GameTag, Rarity
+import pytest
+from copy import deepcopy
+from hearthstone.enums import CardType, GameTag, Race, Rarity
 
 import utils
 
@@ -36,3 +38,165 @@ def test_play_scripts():
 			assert card.type == CardType.HERO_POWER
 		elif card.scripts.play:
 			assert card.type not in (CardType.HERO, CardType.HERO_POWER, CardType.ENCHANTMENT)
+
+
+def test_cache_roundtrip(tmpdir):
+	db = utils.fireplace.cards.CardDB()
+	db.cache_dir = str(tmpdir)
+	db.update(CARDS)
+	db.save_cache("test")
+	assert tmpdir.join("carddb-test.pickle").check()
+
+	cached = db.load_cache("test")
+	assert set(cached) == set(CARDS)
+	for id, card in cached.items():
+		assert not hasattr(card, "scripts")
+		assert card.tags == CARDS[id].tags
+
+	# The cache is keyed, a different key must not be used
+	assert db.load_cache("other") is None
+
+
+def test_cache_cleanup(tmpdir):
+	db = utils.fireplace.cards.CardDB()
+	db.cache_dir = str(tmpdir)
+	# Written by another process
+	tmpdir.join("carddb-other.pickle").write("")
+	db.save_cache("old")
+	db.save_cache("new")
+	assert not tmpdir.join("carddb-old.pickle").check()
+	assert tmpdir.join("carddb-new.pickle").check()
+	assert tmpdir.join("carddb-other.pickle").check()
+
+
+def test_script_registry():
+	registry = utils.fireplace.utils.script_registry
+	assert registry.complete
+	for id, carddef in registry.items():
+		if id in CARDS:
+			assert issubclass(CARDS[id].scripts, carddef)
+
+	# Card helpers shared by every card set are not definitions
+	assert "Refresh" not in registry
+	assert "JoustHelper" not in registry
+
+
+def test_lazy_merge():
+	db = utils.fireplace.cards.CardDB()
+	db.initialize(lazy=True)
+	assert db.lazy
+	unmerged = len(db._unmerged)
+	assert unmerged
+
+	# Filtering does not merge anything
+	assert db.filter(collectible=True, type=CardType.MINION)
+	assert len(db._unmerged) == unmerged
+
+	card = db["CS2_122"]
+	assert card.scripts.update
+	assert "CS2_122" not in db._unmerged
+	assert len(db._unmerged) == unmerged - 1
+
+	assert db.get("CS2_122") is card
+	assert db.get("NOT_A_CARD") is None
+
+
+def test_filter_index():
+	def scan(**kwargs):
+		cards = dict.values(CARDS)
+		for attr, value in kwargs.items():
+			cards = [
+				card for card in cards if (isinstance(value, list) and getattr(card, attr) in value) or
+				getattr(card, attr) == value
+			]
+		return [card.id for card in cards]
+
+	types = [CardType.SPELL, CardType.WEAPON, CardType.MINION]
+	assert CARDS.filter(collectible=True) == scan(collectible=True, type=types)
+	assert CARDS.filter(cost=3, rarity=Rarity.EPIC) == scan(cost=3, rarity=Rarity.EPIC, type=types)
+	assert CARDS.filter(type=CardType.HERO, race=None) == scan(type=CardType.HERO)
+	assert CARDS.filter(cost=[0, 10], type=CardType.MINION) == scan(cost=[0, 10], type=CardType.MINION)
+	assert CARDS.filter(cost=-1) == []
+
+	# Results are copies
+	result = CARDS.filter(collectible=True)
+	result.clear()
+	assert CARDS.filter(collectible=True)
+
+
+def test_card_table(tmpdir):
+	pytest.importorskip("numpy")
+	from fireplace.cards.table import CardTable
+
+	table = CardTable.from_db(CARDS)
+	assert len(table) == len(CARDS)
+	queries = [
+		{"collectible": True},
+		{"cost": 3, "rarity": Rarity.EPIC},
+		{"type": CardType.HERO},
+		{"cost": [0, 10], "type": CardType.MINION, "race": None},
+	]
+	for kwargs in queries:
+		assert table.filter(**kwargs) == CARDS.filter(**kwargs)
+
+	table.save(str(tmpdir))
+	loaded = CardTable.load(str(tmpdir))
+	assert loaded.filter(collectible=True) == CARDS.filter(collectible=True)
+	with pytest.raises(ValueError):
+		loaded["cost"][0] = 0
+
+
+def test_script_index():
+	registry = utils.fireplace.utils.script_registry
+	registry.load()
+	index = registry.index
+	for id, cardset in registry.cardsets.items():
+		assert index[id] == cardset
+	assert registry.lookup("CS2_122") is registry["CS2_122"]
+	assert registry.lookup("NOT_A_CARD") is None
+
+
+def test_simulation_mode():
+	from fireplace.cards.slim import SlimCard
+
+	db = utils.fireplace.cards.CardDB()
+	db.initialize(simulation=True)
+	assert db.simulation
+	for kwargs in ({"collectible": True}, {"cost": 3, "race": Race.MURLOC}):
+		assert db.filter(**kwargs) == CARDS.filter(**kwargs)
+
+	for id in ("CS2_122", "EX1_531", "CS2_029"):
+		card, full = db[id], CARDS[id]
+		assert isinstance(card, SlimCard)
+		assert not hasattr(card, "_localized_tags")
+		assert card.scripts is not None
+		assert card.type == full.type
+		assert card.cost == full.cost
+		assert card.collectible == full.collectible
+		assert dict(card.requirements) == dict(full.requirements)
+		assert list(card.entourage) == list(full.entourage)
+		assert deepcopy(card) is card
+
+
+def test_simulation_mode_custom_cards(monkeypatch):
+	from fireplace.cards.slim import SlimCard
+	from fireplace.cards.utils import custom_card
+
+	db = utils.fireplace.cards.CardDB()
+	# custom_card() adds the card to the global database
+	monkeypatch.setattr(utils.fireplace.cards, "db", db)
+
+	@custom_card
+	class FIREPLACE_TEST_001:
+		tags = {
+			GameTag.CARDNAME: "Custom Test Minion",
+			GameTag.CARDTYPE: CardType.MINION,
+			GameTag.COST: 1,
+		}
+
+	db.initialize(cache=False, simulation=True)
+	assert isinstance(db["CS2_122"], SlimCard)
+	card = db["FIREPLACE_TEST_001"]
+	assert not isinstance(card, SlimCard)
+	assert card.name == "Custom Test Minion"
+	assert card.cost == 1
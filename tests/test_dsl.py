@@ -17,6 +17,27 @@ def test_selector():
 	assert targets[0] == alex
 
 
+def test_planned_selectors(monkeypatch):
+	monkeypatch.setattr(SetOpSelector, "verify_plans", True)
+	game = prepare_game()
+	game.player1.discard_hand()
+	wisp = game.player1.give(WISP)
+	wisp.play()
+	game.player2.summon(WISP)
+	alex = game.player1.give("EX1_561")
+	game.player1.give(MOONFIRE).play(target=game.player2.hero)
+	for selector in (
+		ALL_MINIONS, ENEMY_MINIONS, FRIENDLY_CHARACTERS, ALL_HERO_POWERS,
+		FRIENDLY_HAND + DRAGON, ENEMY_DECK, ALL_PLAYERS, DAMAGED_CHARACTERS,
+		FRIENDLY_MINIONS - SELF, ENEMY_CHARACTERS - MORTALLY_WOUNDED,
+	):
+		assert selector._candidates(game, wisp) is not None
+		selector.eval(game, wisp)
+	assert (FRIENDLY_HAND + DRAGON).eval(game, wisp) == [alex]
+	assert (FRIENDLY_MINIONS - SELF).eval(game, wisp) == []
+	assert DAMAGED_CHARACTERS.eval(game, wisp) == [game.player2.hero]
+
+
 def test_empty_selector():
 	game = prepare_game()
 	game.player1.discard_hand()
@@ -1,5 +1,10 @@
 from utils import *
+from copy import deepcopy
 from fireplace.cards.utils import Give, JOUST
+from fireplace.actions import EventListener, Play
+from fireplace.aura import Refresh
+from fireplace.entity import BuffableEntity
+from fireplace.listeners import ListenerRegistry
 
 
 def test_armor():
@@ -266,6 +271,251 @@ def test_deathrattle():
 	assert len(game.current_player.field) == 1
 
 
+def test_derived_stats(monkeypatch):
+	monkeypatch.setattr(BuffableEntity, "verify_derived_cache", True)
+	game = prepare_game()
+	wisp = game.player1.give(WISP)
+	wisp.play()
+	assert wisp.atk == 1
+	buff = wisp.buff(wisp, "CS2_087e")
+	assert wisp.atk == 1 + 3
+	buff.atk = 5
+	assert wisp.atk == 1 + 5
+	wisp.atk = 2
+	assert wisp.atk == 2 + 5
+
+	raidleader = game.player1.give("CS2_122")
+	raidleader.play()
+	assert wisp.atk == 2 + 5 + 1
+	raidleader.destroy()
+	assert wisp.atk == 2 + 5
+
+	buff.remove()
+	assert wisp.atk == 2
+	wisp.cost = 3
+	assert wisp.cost == 3
+
+
+def test_death_candidates(monkeypatch):
+	monkeypatch.setattr(BaseGame, "verify_deaths", True)
+	game = prepare_game()
+	wisp1 = game.player1.give(WISP)
+	wisp1.play()
+	wisp2 = game.player1.give(WISP)
+	wisp2.play()
+	game.player1.give(MOONFIRE).play(target=wisp1)
+	assert wisp1.dead
+	assert not game.death_candidates
+
+	# Stormwind Champion
+	champion = game.player1.give("CS2_222")
+	champion.play()
+	assert wisp2.health == 2
+	game.player1.give(MOONFIRE).play(target=wisp2)
+	assert wisp2.health == 1
+	champion.destroy()
+	assert champion.dead
+	assert wisp2.dead
+	assert not game.player1.field
+
+
+def test_death_candidates_deepcopy(monkeypatch):
+	monkeypatch.setattr(BaseGame, "verify_deaths", True)
+	game = prepare_game()
+	game.player1.give(WISP).play()
+	game.player1.give(WISP).play()
+	clone = deepcopy(game)
+	wisp1, wisp2 = clone.player1.field
+	clone.player1.give(MOONFIRE).play(target=wisp2)
+	assert wisp2.dead
+	assert clone.player1.field == [wisp1]
+	assert len(game.player1.field) == 2
+	assert not clone.death_candidates
+
+
+def test_listener_registry(monkeypatch):
+	monkeypatch.setattr(ListenerRegistry, "verify", True)
+	game = prepare_game()
+	listeners = game.listeners
+	# Gadgetzan Auctioneer
+	auctioneer = game.player1.give("EX1_095")
+	assert not listeners.may_listen(auctioneer, Play, EventListener.ON)
+	auctioneer.play()
+	assert listeners.may_listen(auctioneer, Play, EventListener.ON)
+	assert not listeners.may_listen(auctioneer, Play, EventListener.AFTER)
+	assert not listeners.may_listen(game.player2.hero, Play, EventListener.ON)
+	game.player1.discard_hand()
+	game.player1.give(MOONFIRE).play(target=game.player2.hero)
+	assert len(game.player1.hand) == 1
+
+	auctioneer.silence()
+	assert not listeners.may_listen(auctioneer, Play, EventListener.ON)
+	game.player1.give(MOONFIRE).play(target=game.player2.hero)
+	assert len(game.player1.hand) == 1
+
+	# Cards in the deck don't listen
+	for card in game.player1.deck:
+		assert not listeners.entity_keys.get(card.entity_id)
+	game.end_turn()
+	game.end_turn()
+
+
+def test_listener_registry_deepcopy():
+	game = prepare_game()
+	auctioneer = game.player1.give("EX1_095")
+	auctioneer.play()
+	game.player1.discard_hand()
+
+	clone = deepcopy(game)
+	assert clone.listeners.may_listen(clone.player1.field[0], Play, EventListener.ON)
+	clone.player1.give(MOONFIRE).play(target=clone.player2.hero)
+	assert len(clone.player1.hand) == 1
+	assert len(game.player1.hand) == 0
+
+
+def test_aura_targets_cache(monkeypatch):
+	monkeypatch.setattr(Refresh, "verify_targets", True)
+	game = prepare_game()
+	raidleader = game.player1.give("CS2_122")
+	raidleader.play()
+	refresh = raidleader.data.scripts.update[0]
+	assert refresh.selector.structural
+	assert not (FRIENDLY_MINIONS + DAMAGED).structural
+	assert refresh.targets(raidleader) == []
+
+	wisp = game.player1.give(WISP)
+	wisp.play()
+	assert wisp.atk == 1 + 1
+	assert refresh.targets(raidleader) is refresh.targets(raidleader)
+	game.player1.give(MOONFIRE).play(target=wisp)
+	assert raidleader.atk == 2
+	wisp2 = game.player1.give(WISP)
+	wisp2.play()
+	assert wisp2.atk == 1 + 1
+	game.end_turn()
+	game.player2.give(MOONFIRE).play(target=raidleader)
+	game.player2.give(MOONFIRE).play(target=raidleader)
+	assert wisp2.atk == 1
+
+
+def test_active_aura_buffs():
+	game = prepare_game()
+	game.player1.discard_hand()
+	auras = game.active_aura_buffs
+	wisp1 = game.player1.give(WISP)
+	wisp1.play()
+	wisp2 = game.player1.give(WISP)
+	wisp2.play()
+	raidleader = game.player1.give("CS2_122")
+	raidleader.play()
+	assert len(auras) == 2
+	buff = auras.get(raidleader, wisp1, "CS2_122e")
+	assert buff in wisp1.buffs
+	assert buff in auras
+	assert auras.get(raidleader, wisp2, "CS2_122e") in wisp2.buffs
+	assert auras.get(raidleader, raidleader, "CS2_122e") is None
+	# All refreshed by the last refresh_auras(), which then moved the tick on
+	assert list(auras.ticks) == [game.tick - 1]
+	assert not auras.expired(game.tick - 1)
+	assert len(auras.expired(game.tick)) == 2
+
+	wisp3 = game.player1.give(WISP)
+	ventureco = game.player1.give("CS2_227")
+	ventureco.play()
+	assert wisp3.cost == 0 + 3
+	slot = auras.get(ventureco, wisp3)
+	assert slot in wisp3.slots
+	assert len(auras) == 2 + 1 + 1
+
+	game.player1.give(MOONFIRE).play(target=wisp1)
+	assert buff not in auras
+	game.player1.give(SILENCE).play(target=raidleader)
+	assert wisp2.atk == 1
+	assert not wisp2.buffs
+	game.player1.give(SILENCE).play(target=ventureco)
+	assert wisp3.cost == 0
+	assert not wisp3.slots
+	assert slot not in auras
+	assert len(auras) == 0
+	assert not auras.ticks
+
+
+def test_active_aura_buffs_deepcopy():
+	game = prepare_game()
+	game.player1.discard_hand()
+	wisp1 = game.player1.give(WISP)
+	wisp1.play()
+	wisp2 = game.player1.give(WISP)
+	raidleader = game.player1.give("CS2_122")
+	raidleader.play()
+	ventureco = game.player1.give("CS2_227")
+	ventureco.play()
+
+	clone = deepcopy(game)
+	wisp1, wisp2, raidleader, ventureco = [
+		clone.entity_by_id[card.entity_id] for card in (wisp1, wisp2, raidleader, ventureco)
+	]
+	# Refresh the auras a few times
+	for i in range(3):
+		clone.player1.give(MOONFIRE).play(target=clone.player2.hero)
+	assert wisp1.atk == 1 + 1
+	assert len(wisp1.buffs) == 1
+	assert wisp2.cost == 0 + 3
+	assert len(wisp2.slots) == 1
+	assert len(clone.active_aura_buffs) == 3
+
+	clone.player1.give(SILENCE).play(target=raidleader)
+	clone.player1.give(SILENCE).play(target=ventureco)
+	assert wisp1.atk == 1
+	assert not wisp1.buffs
+	assert wisp2.cost == 0
+	assert not wisp2.slots
+	assert len(clone.active_aura_buffs) == 0
+	assert len(game.active_aura_buffs) == 3
+
+
+def test_buff_ledger(monkeypatch):
+	monkeypatch.setattr(BuffableEntity, "verify_derived_cache", True)
+	game = prepare_game()
+	wisp = game.player1.give(WISP)
+	wisp.play()
+	for i in range(10):
+		wisp.buff(wisp, "CS2_087e")
+	assert wisp.atk == 1 + 3 * 10
+	humility = wisp.buff(wisp, "EX1_360e")
+	assert wisp.atk == 1
+	buffs = [wisp.buff(wisp, "CS2_087e") for i in range(5)]
+	assert wisp.atk == 1 + 3 * 5
+	# Static buffs after a dynamic modifier
+	buffs[0].remove()
+	assert not any(buff is buffs[0] for buff in wisp.buffs)
+	assert wisp.atk == 1 + 3 * 4
+	humility.remove()
+	assert wisp.atk == 1 + 3 * 14
+
+
+def test_keyword_flags(monkeypatch):
+	monkeypatch.setattr(BuffableEntity, "verify_derived_cache", True)
+	game = prepare_game()
+	wisp = game.player1.give(WISP)
+	wisp.play()
+	assert not wisp.taunt
+	assert wisp not in game.board.filter(taunt=True)
+	assert not TAUNT.eval(game.board, wisp)
+
+	buff = wisp.buff(wisp, "CS2_009e")
+	assert wisp.taunt
+	assert TAUNT.eval(game.board, wisp) == [wisp]
+	buff.remove()
+	assert not wisp.taunt
+	assert not TAUNT.eval(game.board, wisp)
+
+	wisp.taunt = True
+	assert wisp.taunt
+	wisp.silence()
+	assert not wisp.taunt
+
+
 def test_discard_enchanted_cards():
 	# Test for bug #58
 	game = prepare_game()
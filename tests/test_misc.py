@@ -1,4 +1,6 @@
+import pytest
 from utils import *
+from fireplace.clock import FrozenClock, VirtualClock
 
 
 def test_cheat_destroy_deck():
@@ -56,3 +58,144 @@ def test_event_queue_summon():
 	assert reaver in game.player2.hand
 	assert buzzard.health == 1
 	assert len(game.player2.field) == 1
+
+
+def test_random_drafts():
+	from fireplace.deck import Deck
+	from fireplace.draft import random_drafts
+
+	hero = fireplace.cards.db[MAGE]
+	excluded = "CS2_029"  # Fireball
+	for deck in random_drafts(MAGE, 100, exclude=[excluded]):
+		assert len(deck) == Deck.MAX_CARDS
+		assert excluded not in deck
+		for id in set(deck):
+			card = fireplace.cards.db[id]
+			assert card.collectible
+			assert card.card_class in (CardClass.INVALID, hero.card_class)
+			if card.rarity == Rarity.LEGENDARY:
+				assert deck.count(id) == Deck.MAX_UNIQUE_LEGENDARIES
+			else:
+				assert deck.count(id) <= Deck.MAX_UNIQUE_CARDS
+
+
+def test_card_prototypes():
+	game = prepare_game()
+	wisp1 = game.player1.give(WISP)
+	wisp2 = game.player1.give(WISP)
+	assert wisp1 is not wisp2
+	assert wisp1.choose_cards is not wisp2.choose_cards
+	wisp1.play()
+	wisp2.play()
+	game.player1.give("CS2_087").play(target=wisp1)
+	assert wisp1.atk == 1 + 3
+	assert wisp2.atk == 1
+	assert wisp1.buffs
+	assert not wisp2.buffs
+	wisp2.atk = 5
+	assert wisp1.atk == 1 + 3
+	assert game.player1.give(WISP).atk == 1
+
+
+def test_tags_snapshot():
+	game = prepare_game()
+	wisp = game.player1.give(WISP)
+	wisp.play()
+	for entity in (game, game.player1, game.player1.hero, wisp):
+		expected = {
+			tag: int(value) for tag, value in entity.tags.items()
+			if value and not isinstance(value, str)
+		}
+		assert entity.tags.snapshot() == expected
+		assert all(entity.tags.map[tag] for tag in entity.tags)
+	assert wisp.tags.snapshot()[GameTag.ATK] == 1
+
+
+def test_entity_by_id():
+	game = prepare_game()
+	assert game.entity_by_id[game.entity_id] is game
+	for player in game.players:
+		assert game.entity_by_id[player.entity_id] is player
+	for entity in game:
+		assert game.entity_by_id[entity.entity_id] is entity
+
+	wisp = game.player1.give(WISP)
+	assert game.entity_by_id[wisp.entity_id] is wisp
+	wisp.play()
+	assert list(game.entity_by_id)[-1] == wisp.entity_id
+	# The game's play_counter is the game-wide counter
+	counters = [e.play_counter for e in game.entity_by_id.values() if e.is_card]
+	assert counters == sorted(counters)
+
+	buff = wisp.buff(wisp, "CS2_087e")
+	assert game.entity_by_id[buff.entity_id] is buff
+	buff.remove()
+	assert buff.entity_id not in game.entity_by_id
+
+
+def test_board_arrays():
+	pytest.importorskip("numpy")
+	from fireplace.boardstate import BoardArrays, card_index
+
+	game = prepare_game()
+	wisp = game.player1.give(WISP)
+	wisp.play()
+	wisp.buff(wisp, "CS2_009e")
+	arrays = game.board_arrays(player=game.player1)
+	assert arrays.num_minions.tolist() == [1, 0]
+	minion = dict(zip(BoardArrays.MINION_FEATURES, arrays.minions[0, 0].tolist()))
+	assert minion == {
+		"card": card_index(WISP), "atk": 3, "health": 3, "max_health": 3, "cost": 0, "keywords": 1,
+	}
+	assert arrays.minions[0, 1, 0] == -1
+	assert arrays.num_cards[0] == len(game.player1.hand)
+	assert arrays.heroes[0, 0] == game.player1.hero.health
+
+	minions = arrays.minions
+	wisp.destroy()
+	assert game.board_arrays(out=arrays, player=game.player1) is arrays
+	assert arrays.minions is minions
+	assert arrays.num_minions.tolist() == [0, 0]
+	assert arrays.minions[0, 0, 0] == -1
+
+
+def test_game_clock():
+	game = prepare_game()
+	player = game.current_player
+	assert isinstance(game.clock, VirtualClock)
+	assert player.turn_start == game.clock.now()
+	assert player.time_left == player.timeout
+	assert not player.timed_out
+	game.clock.advance(player.timeout)
+	assert player.timed_out
+	game.end_turn()
+	assert game.current_player.turn_start == player.timeout
+	assert not game.current_player.timed_out
+
+	clock = FrozenClock(1000)
+	game = init_game()
+	game.clock = clock
+	game.start()
+	assert game.current_player.turn_start == 1000
+	clock.set(1075)
+	assert game.current_player.timed_out
+
+
+def test_zone_views():
+	game = prepare_game()
+	board, entities = game.board, game.entities
+	assert game.board is board
+	assert game.entities is entities
+	assert list(game) == list(game.all_entities)
+
+	wisp = game.player1.give(WISP)
+	assert game.board is not board
+	board = game.board
+	wisp.play()
+	assert wisp not in board
+	assert game.board == [wisp]
+	wisp.buff(wisp, "CS2_087e")
+	assert wisp.buffs[0] in game.entities
+	wisp.destroy()
+	assert wisp not in game.board
+	assert wisp in game.graveyard
@@ -1,5 +1,6 @@
 import sys; sys.path.append("..")
 import random
+import tempfile
 import fireplace.cards
 from fireplace.cards.heroes import *
 from hearthstone.enums import *
@@ -10,6 +11,11 @@ from fireplace.utils import random_draft
 from fireplace.logging import log
 
 
+# Keep the card database cache of the tests out of the user's cache
+_cache_dir = tempfile.TemporaryDirectory(prefix="fireplace-tests-")
+fireplace.cards.CardDB.cache_dir = _cache_dir.name
+
+
 # Token minions
 ANIMATED_STATUE = "LOEA04_27"
 GOLDSHIRE_FOOTMAN = "CS1_042"